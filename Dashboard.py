@@ -6,9 +6,24 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-import time
 import random
 import warnings
+from aggregates import sector_index
+from bars import PERIODES_BARRES
+from cache import dataset_key, frame_fingerprint, shared_cache
+from downsampling import (LARGEUR_PLEINE, PIXELS_PAR_BOUGIE, downsample_line, downsample_lines, ohlc_buckets,
+                          target_points)
+from figures import figure_cache
+from history import PriceHistory, date_bounds, shared_history, slice_dates
+from risk import FENETRE_RISQUE, JOURS_BOURSE, drawdown_series
+from simulation import DEFAULT_SEED, HISTORY_START
+from storage import STORE_DIR, DataStore
+from scheduler import shared_scheduler
+from screener import SavedScreen, Screener
+from sources import DataSource
+from streaming import shared_pipeline
+from tick_engine import TickEngine
+from ticks import CAPACITE_TICKS
 warnings.filterwarnings('ignore')
 
 # Configuration de la page
@@ -65,16 +80,6 @@ st.markdown("""
         border-left: 5px solid #007E3A;
         background-color: #f8f9fa;
     }
-    .price-change {
-        padding: 0.5rem;
-        border-radius: 5px;
-        margin: 0.2rem 0;
-        font-size: 0.9rem;
-        font-weight: bold;
-    }
-    .positive { background-color: #d4edda; border-left: 4px solid #28a745; color: #155724; }
-    .negative { background-color: #f8d7da; border-left: 4px solid #dc3545; color: #721c24; }
-    .neutral { background-color: #e2e3e5; border-left: 4px solid #6c757d; color: #383d41; }
     .sector-badge {
         display: inline-block;
         padding: 0.25rem 0.5rem;
@@ -88,12 +93,181 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 class MadagascarDashboard:
-    def __init__(self):
+    def __init__(self, seed=DEFAULT_SEED, store_dir=STORE_DIR, workers=None, source=None,
+                 stream=None):
+        self.seed = seed
+        # Source des jeux réels (fichiers, flux HTTP), la simulation complète ce qu'elle ne fournit pas
+        self.source = source if source is not None else DataSource()
+        # Processus de génération de l'historique pour les grands univers (None: séquentiel)
+        self.workers = workers
+        # Magasin local: le démarrage à froid relit les fichiers au lieu de resimuler (None pour désactiver)
+        self.store = DataStore(store_dir) if store_dir else None
         self.entreprises = self.define_entreprises()
-        self.historical_data = self.initialize_historical_data()
-        self.current_data = self.initialize_current_data()
-        self.sector_data = self.initialize_sector_data()
-        self.economic_data = self.initialize_economic_data()
+        # Index secteur → positions des symboles: la sélection de la sidebar devient une simple prise d'indices
+        self.sector_index = sector_index(self.entreprises)
+        # Carnet live, créé après l'historique qui amorce ses cotations d'ouverture
+        self.tick_engine = None
+        # Historique partagé par tout le processus, sans expiration: il suit le carnet live (indice, clôtures)
+        cle_historique = dataset_key('historical_data', self.entreprises, seed=self.seed, debut=HISTORY_START,
+                                     parallele=workers is not None, source=str(self.source))
+        self.history = shared_history(cle_historique, self.initialize_historical_data)
+        # Carnet live commun, avancé par le ticker d'arrière-plan du processus (relevé de la source s'il y en a une)
+        # ou par le pipeline asyncio d'un flux de ticks (hôte, port)
+        cle_carnet = dataset_key('quote_book', self.entreprises, seed=self.seed, source=str(self.source), flux=stream)
+        # Le carnet conserve aussi les derniers ticks de chaque symbole (vue intraday, mémoire bornée)
+        # et construit les barres OHLCV de la séance
+        # Volume simulé d'une séance complète calé sur le volume moyen quotidien de l'historique
+        creer_carnet = lambda: TickEngine(self.initialize_current_data(), capacite_ticks=CAPACITE_TICKS, barres=True,
+                                          volume_seance=[info['volume_moyen'] for info in self.entreprises.values()])
+        if stream is not None:
+            self.ticker = shared_pipeline(cle_carnet, creer_carnet, *stream)
+        else:
+            self.ticker = shared_scheduler(cle_carnet, creer_carnet,
+                                           source=self.source if self.source.provides('cotations') else None)
+        self.tick_engine = self.ticker.engine
+        # Niveau live de l'indice pondéré suivi tick par tick (sans effet si l'historique le suit déjà)
+        self.history.index.attach(self.tick_engine)
+        # Séance close: sa ligne quotidienne rejoint l'historique courant
+        self.tick_engine.session_listeners['historique'] = self.close_session
+        aujourd_hui = datetime.now().date()
+        # Empreintes de contenu des jeux quotidiens (table, empreinte): leur version pour le cache des figures
+        self._empreintes = {}
+        self.figure_savings = 0.0
+        self.sector_data = self.load_shared(
+            'sector_data', lambda: self.load_persisted('sector_data', self.initialize_sector_data), fin=aujourd_hui)
+        # Indicateurs lus depuis la source sans passer par le magasin local (rien à persister)
+        self.economic_data = self.load_shared(
+            'economic_data', self.initialize_economic_data if self.source.provides('economie')
+            else lambda: self.load_persisted('economic_data', self.initialize_economic_data),
+            fin=aujourd_hui, source=str(self.source))
+    
+    def load_shared(self, nom, initializer, **parametres):
+        """Charge un jeu de données depuis le cache du processus ou le génère"""
+        cle = dataset_key(nom, self.entreprises, seed=self.seed, debut=HISTORY_START, **parametres)
+        return shared_cache.get_or_create(cle, initializer)
+    
+    def load_persisted(self, nom, initializer):
+        """Relit un jeu de données du jour depuis le magasin local, ou le génère puis le persiste"""
+        fin = str(datetime.now().date())
+        if self.store is None:
+            return initializer()
+        charge = self.store.load_frame(nom, self.entreprises, self.seed)
+        if charge is not None and charge[1].get('fin') == fin:
+            return charge[0]
+        frame = initializer()
+        self.store.save_frame(nom, self.entreprises, self.seed, frame, fin=fin)
+        return frame
+    
+    def extend_history(self, history=None):
+        """Complète l'historique jusqu'à la veille de la séance live (elle y entre à sa clôture), réécrit s'il a changé"""
+        if self.source.provides('historique'):
+            # Historique réel: jamais complété par des jours simulés
+            return
+        history = history if history is not None else self.history
+        veille = datetime.now() - timedelta(days=1)
+        if self.tick_engine is not None and self.tick_engine.bars is not None:
+            # Minuit passé avant le premier tick: le jour de la séance encore ouverte n'est pas simulé
+            veille = min(veille, self.tick_engine.bars.date - timedelta(days=1))
+        if history.extend(veille) and self.store is not None:
+            self.store.save_history(history)
+    
+    def close_session(self, seance):
+        """Verse la ligne quotidienne de la séance live close dans l'historique et la persiste"""
+        if self.source.provides('historique'):
+            # Historique réel: la ligne live complète la session sans être persistée
+            self.history.close_session(seance)
+            return
+        if not self.history.close_session(seance):
+            # Jour déjà présent: signalé dans la sidebar via last_error du carnet
+            raise ValueError(f"séance du {seance['date'].date()} déjà présente dans l'historique")
+        if self.store is not None:
+            self.store.save_history(self.history)
+    
+    def period_bounds(self, controls):
+        """Bornes (début, fin) de la période choisie dans la sidebar"""
+        if not controls:
+            return None, None
+        # Bornes inversées dans la sidebar: on les remet dans l'ordre plutôt que d'afficher une période vide
+        debut, fin = sorted((controls['date_debut'], controls['date_fin']))
+        return debut, fin
+    
+    def period_slice(self, frame, controls):
+        """Restreint une table triée par date à la période choisie dans la sidebar"""
+        return slice_dates(frame, *self.period_bounds(controls))
+    
+    def resolve_sectors(self, secteurs):
+        """Positions des symboles des secteurs choisis (None si la sélection couvre tout le marché)"""
+        if not secteurs or set(secteurs) >= set(self.sector_index):
+            return None
+        return np.sort(np.concatenate([self.sector_index[secteur] for secteur in secteurs]))
+    
+    def selected_quotes(self, controls):
+        """Carnet live restreint aux symboles des secteurs sélectionnés"""
+        symboles = controls.get('symboles') if controls else None
+        if symboles is None:
+            return self.current_data
+        # Le carnet suit l'ordre de l'univers: prise positionnelle, sans comparaison de chaînes
+        return self.current_data.iloc[symboles]
+    
+    def selected_sectors(self, frame, controls):
+        """Table par secteur restreinte aux secteurs sélectionnés"""
+        secteurs = self.active_sectors(controls)
+        if secteurs is None:
+            return frame
+        return frame[frame['secteur'].isin(secteurs)]
+    
+    def active_sectors(self, controls):
+        """Secteurs sélectionnés dans la sidebar (None si aucun filtre ne s'applique)"""
+        if not controls or controls.get('symboles') is None:
+            return None
+        return controls['secteurs_selectionnes']
+    
+    def selected_index(self, controls):
+        """Indice pondéré quotidien sur la période, recalculé sur les seuls symboles sélectionnés"""
+        symboles = controls.get('symboles') if controls else None
+        if symboles is None:
+            return self.period_slice(self.history.index.levels, controls)
+        dates, prix = self.history.prices()
+        i, j = date_bounds(dates, *self.period_bounds(controls))
+        return pd.DataFrame({'date': dates[i:j],
+                             'indice': self.history.index.subset_levels(prix[i:j], symboles, prix[0])})
+    
+    def data_version(self, nom):
+        """Version d'un jeu de données, qui ne change qu'avec son contenu"""
+        if nom == 'historical_data':
+            return str(self.history.last_date)
+        # Empreinte recalculée seulement quand la table elle-même est remplacée
+        frame = getattr(self, nom)
+        table, empreinte = self._empreintes.get(nom, (None, None))
+        if table is not frame:
+            empreinte = frame_fingerprint(frame)
+            self._empreintes[nom] = (frame, empreinte)
+        return empreinte
+    
+    def cached_figure(self, graphique, nom, controls, builder, layout=None, **filtres):
+        """Figure mémoïsée pour (version du jeu de données, filtres, graphique), partagée entre sessions"""
+        version = dataset_key(nom, self.entreprises, seed=self.seed, version=self.data_version(nom))
+        if controls:
+            filtres = dict(filtres, periode=self.period_bounds(controls),
+                           secteurs=None if controls.get('symboles') is None
+                           else tuple(sorted(controls['secteurs_selectionnes'])))
+        
+        def construire():
+            fig = builder()
+            return fig.update_layout(**layout) if layout else fig
+        fig, economie = figure_cache.get_or_build(graphique, version, filtres, construire)
+        self.figure_savings += economie
+        return fig
+    
+    @property
+    def historical_data(self):
+        """Table longue (date, symbole) de l'historique des prix"""
+        return self.history.frame
+    
+    @property
+    def current_data(self):
+        """Dernier instantané publié du carnet de cotations live"""
+        return self.ticker.snapshot()
         
     def define_entreprises(self):
         """Définit les principales entreprises malgaches"""
@@ -222,73 +396,58 @@ class MadagascarDashboard:
     
     def initialize_historical_data(self):
         """Initialise les données historiques des prix"""
-        dates = pd.date_range('2020-01-01', datetime.now(), freq='D')
-        data = []
-        
-        for date in dates:
-            for symbole, info in self.entreprises.items():
-                # Prix de base réaliste selon la capitalisation
-                base_price = info['market_cap'] / 1e6 * random.uniform(0.1, 0.3)
-                
-                # Impact COVID (2020)
-                if date.year == 2020 and date.month <= 6:
-                    covid_impact = random.uniform(0.3, 0.6)
-                elif date.year == 2020:
-                    covid_impact = random.uniform(0.6, 0.9)
-                elif date.year == 2021:
-                    covid_impact = random.uniform(0.9, 1.2)
-                else:
-                    covid_impact = random.uniform(1.0, 1.4)
-                
-                # Volatilité quotidienne
-                daily_volatility = random.uniform(0.92, 1.08)
-                
-                prix = base_price * covid_impact * daily_volatility * random.uniform(0.95, 1.05)
-                volume = info['volume_moyen'] * random.uniform(0.3, 3.0)
-                
-                data.append({
-                    'date': date,
-                    'symbole': symbole,
-                    'prix': prix,
-                    'volume': volume,
-                    'secteur': info['secteur'],
-                    'market_cap': info['market_cap'] * random.uniform(0.9, 1.1)
-                })
-        
-        return pd.DataFrame(data)
+        if self.source.provides('historique'):
+            history = PriceHistory(self.entreprises, self.seed, start=HISTORY_START)
+            history.load(self.source.history(self.entreprises))
+            return history
+        history = None
+        if self.store is not None:
+            history = self.store.load_history(self.entreprises, self.seed, HISTORY_START, workers=self.workers)
+        if history is None:
+            # Génération vectorisée de toutes les séries (dates × symboles), complétée ensuite jour par jour
+            history = PriceHistory(self.entreprises, self.seed, start=HISTORY_START, workers=self.workers)
+        self.extend_history(history)
+        return history
     
     def initialize_current_data(self):
         """Initialise les données courantes"""
         current_data = []
         for symbole, info in self.entreprises.items():
-            # Dernier prix historique
-            last_data = self.historical_data[self.historical_data['symbole'] == symbole].iloc[-1]
+            # Dernier prix historique (index des dernières lignes, maintenu à chaque extension)
+            dernier_prix = self.history.latest_row(symbole)['prix']
             
-            # Variation quotidienne simulée
-            change_pct = random.uniform(-0.08, 0.08)
-            change_abs = last_data['prix'] * change_pct
+            # Ouverture de séance: écart simulé sur la dernière clôture, extrêmes suivis ensuite tick par tick
+            change_pct = random.uniform(-0.03, 0.03)
+            ouverture = dernier_prix * (1 + change_pct)
             
             current_data.append({
                 'symbole': symbole,
                 'nom_complet': info['nom_complet'],
                 'secteur': info['secteur'],
-                'prix_actuel': last_data['prix'] + change_abs,
+                'prix_actuel': ouverture,
                 'variation_pct': change_pct * 100,
-                'variation_abs': change_abs,
-                'volume': info['volume_moyen'] * random.uniform(0.5, 2.0),
+                'variation_abs': 0.0,
+                # Volume du fixing d'ouverture, cumulé ensuite au fil de la séance
+                'volume': info['volume_moyen'] * random.uniform(0.05, 0.2),
                 'market_cap': info['market_cap'],
                 'dividende_yield': info['dividende_yield'],
                 'poids_indice': info['poids_indice'],
-                'ouverture': last_data['prix'] * random.uniform(0.95, 1.05),
-                'plus_haut': last_data['prix'] * random.uniform(1.02, 1.08),
-                'plus_bas': last_data['prix'] * random.uniform(0.92, 0.98)
+                'ouverture': ouverture,
+                'plus_haut': ouverture,
+                'plus_bas': ouverture
             })
         
         return pd.DataFrame(current_data)
     
+    def dataset_rng(self, nom):
+        """Générateur d'un jeu simulé, dérivé de la graine du dashboard et du nom du jeu (reproductible)"""
+        return np.random.default_rng([self.seed, *nom.encode('utf-8')])
+    
     def initialize_sector_data(self):
         """Initialise les données par secteur"""
-        secteurs = list(set([info['secteur'] for info in self.entreprises.values()]))
+        # Ordre d'apparition des secteurs (stable d'un processus à l'autre, contrairement à un set)
+        secteurs = list(dict.fromkeys(info['secteur'] for info in self.entreprises.values()))
+        rng = self.dataset_rng('sector_data')
         data = []
         
         for secteur in secteurs:
@@ -301,53 +460,38 @@ class MadagascarDashboard:
                 'poids_indice': poids_total,
                 'market_cap_total': market_cap_total,
                 'nombre_entreprises': len(entreprises_secteur),
-                'performance_moyenne': random.uniform(-3, 6)
+                'performance_moyenne': rng.uniform(-3, 6)
             })
         
         return pd.DataFrame(data)
     
     def initialize_economic_data(self):
         """Initialise les données économiques de Madagascar"""
+        if self.source.provides('economie'):
+            return self.source.economic()
         dates = pd.date_range('2020-01-01', datetime.now(), freq='M')
+        rng = self.dataset_rng('economic_data')
         economic_data = []
         
         for date in dates:
             # Données économiques simulées mais réalistes pour Madagascar
             economic_data.append({
                 'date': date,
-                'inflation': random.uniform(5, 12),
-                'croissance_pib': random.uniform(-8, 8),
-                'taux_directeur': random.uniform(8, 12),
-                'taux_change_usd': random.uniform(3800, 4500),
-                'taux_change_eur': random.uniform(4200, 5000),
-                'reserves_devises': random.uniform(800, 1500),
-                'dette_publique': random.uniform(35, 45)
+                'inflation': rng.uniform(5, 12),
+                'croissance_pib': rng.uniform(-8, 8),
+                'taux_directeur': rng.uniform(8, 12),
+                'taux_change_usd': rng.uniform(3800, 4500),
+                'taux_change_eur': rng.uniform(4200, 5000),
+                'reserves_devises': rng.uniform(800, 1500),
+                'dette_publique': rng.uniform(35, 45)
             })
         
         return pd.DataFrame(economic_data)
     
     def update_live_data(self):
         """Met à jour les données en temps réel"""
-        for idx in self.current_data.index:
-            symbole = self.current_data.loc[idx, 'symbole']
-            
-            # Simulation de variations de prix
-            if random.random() < 0.4:  # 40% de chance de changement
-                variation = random.uniform(-0.04, 0.04)
-                nouveau_prix = self.current_data.loc[idx, 'prix_actuel'] * (1 + variation)
-                
-                self.current_data.loc[idx, 'prix_actuel'] = nouveau_prix
-                self.current_data.loc[idx, 'variation_pct'] = variation * 100
-                self.current_data.loc[idx, 'variation_abs'] = nouveau_prix - self.current_data.loc[idx, 'ouverture']
-                
-                # Mise à jour des plus hauts/plus bas
-                if nouveau_prix > self.current_data.loc[idx, 'plus_haut']:
-                    self.current_data.loc[idx, 'plus_haut'] = nouveau_prix
-                if nouveau_prix < self.current_data.loc[idx, 'plus_bas']:
-                    self.current_data.loc[idx, 'plus_bas'] = nouveau_prix
-                
-                # Mise à jour du volume
-                self.current_data.loc[idx, 'volume'] *= random.uniform(0.8, 1.3)
+        # Tick complet appliqué en colonnes (masque de 40%, choc multiplicatif, plus haut/bas, volume)
+        self.ticker.tick_now()
     
     def display_header(self):
         """Affiche l'en-tête du dashboard"""
@@ -360,8 +504,13 @@ class MadagascarDashboard:
                        unsafe_allow_html=True)
             st.markdown("**Surveillance et analyse des performances économiques et boursières de Madagascar**")
         
-        current_time = datetime.now().strftime('%H:%M:%S')
+        current_time = datetime.fromtimestamp(self.ticker.last_tick).strftime('%H:%M:%S')
         st.sidebar.markdown(f"**🕐 Dernière mise à jour: {current_time}**")
+        if self.ticker.last_error is not None:
+            st.sidebar.warning(f"Flux de cotations indisponible, dernières cotations conservées "
+                               f"({self.ticker.last_error})")
+        if self.tick_engine.last_error is not None:
+            st.sidebar.warning(f"Clôture de séance non versée dans l'historique ({self.tick_engine.last_error})")
     
     def display_key_metrics(self):
         """Affiche les métriques clés économiques"""
@@ -369,8 +518,9 @@ class MadagascarDashboard:
                    unsafe_allow_html=True)
         
         # Calcul des métriques
-        indice_boursier = self.current_data['prix_actuel'].sum() / len(self.current_data) * 100
-        variation_indice = self.current_data['variation_pct'].mean()
+        # Indice pondéré live, comparé à la dernière clôture historique
+        indice_boursier = self.history.index.live_level()
+        variation_indice = (indice_boursier / self.history.index.last_close - 1) * 100
         volume_total = self.current_data['volume'].sum()
         entreprises_hausse = len(self.current_data[self.current_data['variation_pct'] > 0])
         
@@ -411,38 +561,34 @@ class MadagascarDashboard:
                 f"{random.uniform(-50, 50):+.0f} MGA"
             )
     
-    def create_market_overview(self):
+    def create_market_overview(self, controls=None):
         """Crée la vue d'ensemble du marché malgache"""
         st.markdown('<h3 class="section-header">🏛️ VUE D\'ENSEMBLE DU MARCHÉ MALGACHE</h3>', 
                    unsafe_allow_html=True)
         
+        economic_data = self.period_slice(self.economic_data, controls)
+        sector_data = self.selected_sectors(self.sector_data, controls)
+        current_data = self.selected_quotes(controls)
+        
         tab1, tab2, tab3, tab4 = st.tabs(["Performance Indices", "Répartition Secteurs", "Top Performers", "Indicateurs Économiques"])
         
         with tab1:
             col1, col2 = st.columns(2)
             
             with col1:
-                # Évolution de l'indice boursier simulé
-                indice_evolution = self.historical_data.groupby('date')['prix'].mean().reset_index()
-                indice_evolution['indice'] = indice_evolution['prix'] * 100
-                
-                fig = px.line(indice_evolution, 
-                             x='date', 
-                             y='indice',
-                             title='Évolution de l\'Indice Boursier (2020-2024)',
-                             color_discrete_sequence=['#007E3A'])
-                fig.update_layout(yaxis_title="Points d'Indice")
+                # Évolution de l'indice boursier simulé, réduite à la résolution du graphique (LTTB)
+                fig = self.cached_figure('marche_indice', 'historical_data', controls, lambda: px.line(
+                    downsample_line(self.selected_index(controls), 'date', 'indice', target_points()), x='date',
+                    y='indice', title='Évolution de l\'Indice Boursier', color_discrete_sequence=['#007E3A']),
+                    layout=dict(yaxis_title="Points d'Indice"))
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
                 # Performance par secteur
-                fig = px.bar(self.sector_data, 
-                            x='secteur', 
-                            y='performance_moyenne',
-                            title='Performance Moyenne par Secteur (%)',
-                            color='secteur',
-                            color_discrete_sequence=px.colors.qualitative.Set3)
-                fig.update_layout(yaxis_title="Performance (%)")
+                fig = self.cached_figure('marche_performance_secteurs', 'sector_data', controls, lambda: px.bar(
+                    sector_data, x='secteur', y='performance_moyenne', title='Performance Moyenne par Secteur (%)',
+                    color='secteur', color_discrete_sequence=px.colors.qualitative.Set3),
+                    layout=dict(yaxis_title="Performance (%)"))
                 st.plotly_chart(fig, use_container_width=True)
         
         with tab2:
@@ -450,23 +596,18 @@ class MadagascarDashboard:
             
             with col1:
                 # Répartition par secteur
-                fig = px.pie(self.sector_data, 
-                            values='poids_indice', 
-                            names='secteur',
-                            title='Répartition de l\'Indice par Secteur',
-                            color='secteur',
-                            color_discrete_sequence=px.colors.qualitative.Set3)
+                fig = self.cached_figure('marche_repartition_secteurs', 'sector_data', controls, lambda: px.pie(
+                    sector_data, values='poids_indice', names='secteur', title='Répartition de l\'Indice par Secteur',
+                    color='secteur', color_discrete_sequence=px.colors.qualitative.Set3))
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
                 # Capitalisation par secteur
-                fig = px.bar(self.sector_data, 
-                            x='secteur', 
-                            y='market_cap_total',
-                            title='Capitalisation Boursière par Secteur (Millions €)',
-                            color='secteur',
-                            color_discrete_sequence=px.colors.qualitative.Set3)
-                fig.update_layout(yaxis_title="Capitalisation (Millions €)")
+                fig = self.cached_figure('marche_capitalisation_secteurs', 'sector_data', controls, lambda: px.bar(
+                    sector_data, x='secteur', y='market_cap_total',
+                    title='Capitalisation Boursière par Secteur (Millions €)', color='secteur',
+                    color_discrete_sequence=px.colors.qualitative.Set3),
+                    layout=dict(yaxis_title="Capitalisation (Millions €)"))
                 st.plotly_chart(fig, use_container_width=True)
         
         with tab3:
@@ -474,7 +615,7 @@ class MadagascarDashboard:
             
             with col1:
                 # Top gainers
-                top_gainers = self.current_data.nlargest(5, 'variation_pct')
+                top_gainers = current_data.nlargest(5, 'variation_pct')
                 fig = px.bar(top_gainers, 
                             x='variation_pct', 
                             y='symbole',
@@ -486,7 +627,7 @@ class MadagascarDashboard:
             
             with col2:
                 # Top losers
-                top_losers = self.current_data.nsmallest(5, 'variation_pct')
+                top_losers = current_data.nsmallest(5, 'variation_pct')
                 fig = px.bar(top_losers, 
                             x='variation_pct', 
                             y='symbole',
@@ -501,40 +642,117 @@ class MadagascarDashboard:
             col1, col2 = st.columns(2)
             
             with col1:
-                fig = px.line(self.economic_data, 
-                             x='date', 
-                             y='inflation',
-                             title='Évolution de l\'Inflation (%)',
-                             color_discrete_sequence=['#FF6B00'])
+                fig = self.cached_figure('marche_inflation', 'economic_data', controls, lambda: px.line(
+                    economic_data, x='date', y='inflation', title='Évolution de l\'Inflation (%)',
+                    color_discrete_sequence=['#FF6B00']))
                 st.plotly_chart(fig, use_container_width=True)
                 
-                fig = px.line(self.economic_data, 
-                             x='date', 
-                             y='taux_directeur',
-                             title='Taux Directeur de la Banque Centrale (%)',
-                             color_discrete_sequence=['#660099'])
+                fig = self.cached_figure('marche_taux_directeur', 'economic_data', controls, lambda: px.line(
+                    economic_data, x='date', y='taux_directeur', title='Taux Directeur de la Banque Centrale (%)',
+                    color_discrete_sequence=['#660099']))
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
-                fig = px.line(self.economic_data, 
-                             x='date', 
-                             y='croissance_pib',
-                             title='Croissance du PIB (%)',
-                             color_discrete_sequence=['#007E3A'])
+                fig = self.cached_figure('marche_croissance_pib', 'economic_data', controls, lambda: px.line(
+                    economic_data, x='date', y='croissance_pib', title='Croissance du PIB (%)',
+                    color_discrete_sequence=['#007E3A']))
                 st.plotly_chart(fig, use_container_width=True)
                 
-                fig = px.line(self.economic_data, 
-                             x='date', 
-                             y='taux_change_usd',
-                             title='Taux de Change USD/MGA',
-                             color_discrete_sequence=['#004B87'])
+                fig = self.cached_figure('marche_taux_change', 'economic_data', controls, lambda: px.line(
+                    economic_data, x='date', y='taux_change_usd', title='Taux de Change USD/MGA',
+                    color_discrete_sequence=['#004B87']))
                 st.plotly_chart(fig, use_container_width=True)
     
-    def create_entreprises_live(self):
+    @property
+    def screener(self):
+        """Screener du carnet live, volatilités réindexées quand l'historique gagne un jour"""
+        return self.load_shared('screener',
+                                lambda: Screener(self.tick_engine, self.history.risk.volatility(JOURS_BOURSE)),
+                                fin=self.data_version('historical_data'))
+    
+    def screen_results(self, screener, positions):
+        """Lignes du carnet retenues par le screener, avec leur volatilité"""
+        return self.current_data.iloc[positions][['symbole', 'nom_complet', 'secteur', 'prix_actuel',
+                                                  'variation_pct', 'dividende_yield', 'market_cap']].assign(
+            volatilite=screener.values('volatilite')[positions])
+    
+    def quote_board(self, quotes):
+        """Tableau des cours mis en forme par opérations de colonnes (tendance, unités)"""
+        variation = quotes['variation_pct'].to_numpy()
+        # Tendance hausse / baisse / stable calculée pour toute la colonne
+        tendance = np.select([variation > 0, variation < 0], ['🟢 Hausse', '🔴 Baisse'], '⚪ Stable')
+        return pd.DataFrame({
+            'Symbole': quotes['symbole'],
+            'Entreprise': quotes['nom_complet'],
+            'Secteur': quotes['secteur'],
+            'Prix (€)': quotes['prix_actuel'],
+            'Variation (%)': variation,
+            'Variation (€)': quotes['variation_abs'],
+            'Tendance': tendance,
+            'Volume': quotes['volume'],
+            'Market Cap (M€)': quotes['market_cap'] / 1e6,
+            'Div. Yield (%)': quotes['dividende_yield']
+        })
+    
+    def intraday_ticks(self, symbole, n=None):
+        """Derniers ticks d'un symbole lus dans le tampon du carnet (None si le carnet ne les conserve pas)"""
+        tampon = self.tick_engine.intraday
+        if tampon is None:
+            return None
+        with self.tick_engine.lock:
+            return tampon.frame(self.history.matrix.positions[symbole], n)
+    
+    def intraday_bars(self, symbole, periode):
+        """Barres OHLCV de la séance en cours pour un symbole, barre non terminée comprise"""
+        with self.tick_engine.lock:
+            return self.tick_engine.bars.frame(periode, self.history.matrix.positions[symbole])
+    
+    def create_intraday_view(self, symboles):
+        """Parcours intraday d'une entreprise: courbe des derniers ticks ou bougies d'une minute"""
+        if not symboles or self.tick_engine.intraday is None:
+            return
+        st.subheader("Parcours Intraday")
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            # Clé fixe: le choix survit aux rafraîchissements même si la liste des symboles filtrés change
+            symbole = st.selectbox("Entreprise (intraday):", symboles, key='symbole_intraday')
+        with col2:
+            vues = ["Ligne"] + ([f"Bougies {nom}" for nom in PERIODES_BARRES] if self.tick_engine.bars is not None
+                                else [])
+            vue = st.radio("Vue:", vues, horizontal=True)
+        nom = self.entreprises[symbole]['nom_complet']
+        
+        if vue == "Ligne":
+            ticks = self.intraday_ticks(symbole)
+            fig = px.line(ticks, x='date', y='prix', markers=len(ticks) < 100,
+                          title=f'Derniers Ticks - {nom}')
+            fig.update_traces(line_color=self.entreprises[symbole]['couleur'])
+            legende = (f"Ticks conservés: {len(ticks)} / {self.tick_engine.intraday.capacite} "
+                       f"(tampon circulaire par symbole)")
+        else:
+            periode = vue.split()[-1]
+            bougies = self.intraday_bars(symbole, periode)
+            fig = go.Figure(go.Candlestick(x=bougies['date'],
+                                           open=bougies['ouverture'],
+                                           high=bougies['plus_haut'],
+                                           low=bougies['plus_bas'],
+                                           close=bougies['cloture'],
+                                           name=symbole))
+            fig.update_layout(title=f'Bougies Intraday {periode} - {nom}', xaxis_rangeslider_visible=False)
+            legende = (f"{len(bougies)} barres {periode} depuis l'ouverture de la séance, "
+                       f"volume {bougies['volume'].sum():,.0f}")
+        fig.update_layout(height=350, xaxis_title="Heure", yaxis_title="Prix (€)")
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(legende)
+    
+    def create_entreprises_live(self, controls=None):
         """Affiche les entreprises en temps réel"""
         st.markdown('<h3 class="section-header">🏢 ENTREPRISES EN TEMPS RÉEL</h3>', 
                    unsafe_allow_html=True)
         
+        current_data = self.selected_quotes(controls)
+        secteurs = list(self.selected_sectors(self.sector_data, controls)['secteur'].unique())
+        
         tab1, tab2, tab3 = st.tabs(["Tableau des Cours", "Analyse Secteur", "Screener"])
         
         with tab1:
@@ -542,7 +760,7 @@ class MadagascarDashboard:
             col1, col2, col3 = st.columns(3)
             with col1:
                 secteur_filtre = st.selectbox("Secteur:", 
-                                            ['Tous'] + list(self.sector_data['secteur'].unique()))
+                                            ['Tous'] + secteurs)
             with col2:
                 performance_filtre = st.selectbox("Performance:", 
                                                 ['Tous', 'En hausse', 'En baisse', 'Stable'])
@@ -550,66 +768,49 @@ class MadagascarDashboard:
                 tri_filtre = st.selectbox("Trier par:", 
                                         ['Variation %', 'Volume', 'Capitalisation', 'Poids Indice'])
             
-            # Application des filtres
-            entreprises_filtrees = self.current_data.copy()
+            # Application des filtres (un seul masque, une seule sélection)
+            variation = current_data['variation_pct'].to_numpy()
+            masque = np.ones(len(current_data), dtype=bool)
             if secteur_filtre != 'Tous':
-                entreprises_filtrees = entreprises_filtrees[entreprises_filtrees['secteur'] == secteur_filtre]
+                masque &= current_data['secteur'].to_numpy() == secteur_filtre
             if performance_filtre == 'En hausse':
-                entreprises_filtrees = entreprises_filtrees[entreprises_filtrees['variation_pct'] > 0]
+                masque &= variation > 0
             elif performance_filtre == 'En baisse':
-                entreprises_filtrees = entreprises_filtrees[entreprises_filtrees['variation_pct'] < 0]
+                masque &= variation < 0
             elif performance_filtre == 'Stable':
-                entreprises_filtrees = entreprises_filtrees[entreprises_filtrees['variation_pct'] == 0]
+                masque &= variation == 0
+            entreprises_filtrees = current_data[masque]
             
             # Tri
-            if tri_filtre == 'Variation %':
-                entreprises_filtrees = entreprises_filtrees.sort_values('variation_pct', ascending=False)
-            elif tri_filtre == 'Volume':
-                entreprises_filtrees = entreprises_filtrees.sort_values('volume', ascending=False)
-            elif tri_filtre == 'Capitalisation':
-                entreprises_filtrees = entreprises_filtrees.sort_values('market_cap', ascending=False)
-            elif tri_filtre == 'Poids Indice':
-                entreprises_filtrees = entreprises_filtrees.sort_values('poids_indice', ascending=False)
-            
-            # Affichage des entreprises
-            for _, entreprise in entreprises_filtrees.iterrows():
-                change_class = ""
-                if entreprise['variation_pct'] > 0:
-                    change_class = "positive"
-                elif entreprise['variation_pct'] < 0:
-                    change_class = "negative"
-                else:
-                    change_class = "neutral"
-                
-                col1, col2, col3, col4, col5 = st.columns([1, 2, 1, 1, 1])
-                with col1:
-                    st.markdown(f"**{entreprise['symbole']}**")
-                    st.markdown(f"*{entreprise['secteur']}*")
-                with col2:
-                    st.markdown(f"**{entreprise['nom_complet']}**")
-                    st.markdown(f"Market Cap: {entreprise['market_cap']/1e6:.1f} M€")
-                with col3:
-                    st.markdown(f"**{entreprise['prix_actuel']:.2f}€**")
-                    st.markdown(f"Div. Yield: {entreprise['dividende_yield']}%")
-                with col4:
-                    variation_str = f"{entreprise['variation_pct']:+.2f}%"
-                    st.markdown(f"**{variation_str}**")
-                    st.markdown(f"{entreprise['variation_abs']:+.2f}€")
-                with col5:
-                    st.markdown(f"<div class='price-change {change_class}'>{variation_str}</div>", 
-                               unsafe_allow_html=True)
-                    st.markdown(f"Vol: {entreprise['volume']:,.0f}")
-                
-                st.markdown("---")
+            colonnes_tri = {'Variation %': 'variation_pct', 'Volume': 'volume',
+                            'Capitalisation': 'market_cap', 'Poids Indice': 'poids_indice'}
+            entreprises_filtrees = entreprises_filtrees.sort_values(colonnes_tri[tri_filtre], ascending=False)
+            
+            # Tableau des cours: un seul composant virtualisé, quel que soit le nombre de symboles
+            st.dataframe(self.quote_board(entreprises_filtrees),
+                         use_container_width=True,
+                         hide_index=True,
+                         height=min(600, 38 + 35 * len(entreprises_filtrees)),
+                         column_config={
+                             'Prix (€)': st.column_config.NumberColumn(format='%.2f'),
+                             'Variation (%)': st.column_config.NumberColumn(format='%+.2f'),
+                             'Variation (€)': st.column_config.NumberColumn(format='%+.2f'),
+                             'Volume': st.column_config.NumberColumn(format='%d'),
+                             'Market Cap (M€)': st.column_config.NumberColumn(format='%.1f'),
+                             'Div. Yield (%)': st.column_config.NumberColumn(format='%.1f')
+                         })
+            
+            # Symboles dans l'ordre de l'univers: le tri par variation ne réordonne pas le sélecteur à chaque tick
+            self.create_intraday_view(list(current_data['symbole'][masque]))
         
         with tab2:
             # Analyse détaillée par secteur
             secteur_selectionne = st.selectbox("Sélectionnez un secteur:", 
-                                             self.sector_data['secteur'].unique())
+                                             secteurs)
             
             if secteur_selectionne:
-                entreprises_secteur = self.current_data[
-                    self.current_data['secteur'] == secteur_selectionne
+                entreprises_secteur = current_data[
+                    current_data['secteur'] == secteur_selectionne
                 ]
                 
                 col1, col2 = st.columns(2)
@@ -648,36 +849,46 @@ class MadagascarDashboard:
                 max_volatilite = st.number_input("Volatilité Max (%)", 
                                                min_value=0, max_value=100, value=60)
                 secteur_screener = st.multiselect("Secteurs", 
-                                                 self.sector_data['secteur'].unique())
+                                                 secteurs)
             
             with col3:
                 min_performance = st.number_input("Performance Min (%)", 
                                                 min_value=-50.0, max_value=50.0, value=0.0)
                 appliquer_filtres = st.button("Appliquer les Filtres")
             
+            # Critères {champ: (min, max)} évalués par le screener indexé, sans copie intermédiaire du carnet
+            criteres = {
+                'market_cap': (min_market_cap * 1e6, None),
+                'dividende_yield': (min_dividende, None),
+                'volatilite': (None, max_volatilite),
+                'variation_pct': (min_performance, None)
+            }
+            secteurs_ecran = secteur_screener or self.active_sectors(controls)
+            screener = self.screener
+            
             if appliquer_filtres:
-                entreprises_filtrees = self.current_data.copy()
-                entreprises_filtrees = entreprises_filtrees[
-                    entreprises_filtrees['market_cap'] >= min_market_cap * 1e6
-                ]
-                entreprises_filtrees = entreprises_filtrees[
-                    entreprises_filtrees['dividende_yield'] >= min_dividende
-                ]
-                entreprises_filtrees = entreprises_filtrees[
-                    entreprises_filtrees['variation_pct'] >= min_performance
-                ]
-                
-                if secteur_screener:
-                    entreprises_filtrees = entreprises_filtrees[
-                        entreprises_filtrees['secteur'].isin(secteur_screener)
-                    ]
-                
-                st.write(f"**{len(entreprises_filtrees)} entreprises correspondent aux critères**")
-                st.dataframe(entreprises_filtrees[['symbole', 'nom_complet', 'secteur', 'prix_actuel', 
-                                                 'variation_pct', 'dividende_yield', 'market_cap']], 
-                           use_container_width=True)
+                positions = screener.screen(criteres, secteurs_ecran)
+                st.write(f"**{len(positions)} entreprises correspondent aux critères**")
+                st.dataframe(self.screen_results(screener, positions), use_container_width=True)
+            
+            # Écrans sauvegardés, réévalués à chaque rendu sur les seuls symboles modifiés par les ticks
+            ecrans = st.session_state.setdefault('ecrans_sauvegardes', {})
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                nom_ecran = st.text_input("Nom de l'écran", value=f"Écran {len(ecrans) + 1}")
+            with col2:
+                if st.button("💾 Sauvegarder l'écran"):
+                    ecrans[nom_ecran] = SavedScreen(screener, criteres, secteurs_ecran)
+            
+            for nom, ecran in list(ecrans.items()):
+                if ecran.screener is not screener:
+                    # Nouveau jour d'historique: volatilités réindexées, l'écran est réévalué en entier
+                    ecran = ecrans[nom] = SavedScreen(screener, ecran.criteres, ecran.secteurs)
+                positions = ecran.refresh()
+                with st.expander(f"📌 {nom} — {len(positions)} entreprises"):
+                    st.dataframe(self.screen_results(screener, positions), use_container_width=True)
     
-    def create_sector_analysis(self):
+    def create_sector_analysis(self, controls=None):
         """Analyse sectorielle détaillée"""
         st.markdown('<h3 class="section-header">📊 ANALYSE SECTORIELLE DÉTAILLÉE</h3>', 
                    unsafe_allow_html=True)
@@ -686,7 +897,7 @@ class MadagascarDashboard:
         
         with tab1:
             # Performance détaillée par secteur
-            sector_performance = self.current_data.groupby('secteur').agg({
+            sector_performance = self.selected_quotes(controls).groupby('secteur').agg({
                 'variation_pct': 'mean',
                 'volume': 'sum',
                 'market_cap': 'sum',
@@ -716,18 +927,63 @@ class MadagascarDashboard:
                 st.plotly_chart(fig, use_container_width=True)
         
         with tab2:
-            # Comparaison historique des secteurs
-            sector_evolution = self.historical_data.groupby([
-                self.historical_data['date'].dt.to_period('M').dt.to_timestamp(),
-                'secteur'
-            ])['prix'].mean().reset_index()
-            
-            fig = px.line(sector_evolution, 
-                         x='date', 
-                         y='prix',
-                         color='secteur',
-                         title='Évolution Comparative des Secteurs (2020-2024)',
-                         color_discrete_sequence=px.colors.qualitative.Set3)
+            # Sous-indices sectoriels pondérés (base 1000 au premier jour d'historique)
+            def sous_indices():
+                niveaux = self.selected_sectors(
+                    self.period_slice(self.history.index.sector_levels, controls), controls)
+                niveaux = downsample_lines(niveaux, 'date', 'indice', target_points(LARGEUR_PLEINE),
+                                           groupe='secteur')
+                
+                return px.line(niveaux, 
+                               x='date', 
+                               y='indice',
+                               color='secteur',
+                               title='Sous-Indices Sectoriels MVM',
+                               color_discrete_sequence=px.colors.qualitative.Set3)
+            
+            fig = self.cached_figure('secteurs_sous_indices', 'historical_data', controls, sous_indices,
+                                     layout=dict(yaxis_title="Points d'Indice"))
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Comparaison historique des secteurs (moyennes mensuelles matérialisées)
+            def evolution_secteurs():
+                sector_evolution = self.selected_sectors(
+                    self.period_slice(self.history.aggregates.sector_monthly, controls), controls)
+                sector_evolution = downsample_lines(sector_evolution, 'date', 'prix', target_points(LARGEUR_PLEINE),
+                                                    groupe='secteur')
+                
+                return px.line(sector_evolution, 
+                               x='date', 
+                               y='prix',
+                               color='secteur',
+                               title='Évolution Comparative des Secteurs',
+                               color_discrete_sequence=px.colors.qualitative.Set3)
+            
+            fig = self.cached_figure('secteurs_evolution', 'historical_data', controls, evolution_secteurs)
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Chandeliers mensuels par entreprise
+            symboles = controls.get('symboles') if controls else None
+            options_ohlc = list(self.entreprises) if symboles is None else [self.history.matrix.symboles[j]
+                                                                             for j in symboles]
+            symbole_ohlc = st.selectbox("Entreprise (OHLC mensuel):", options_ohlc)
+            
+            def chandeliers():
+                ohlc = self.history.aggregates.ohlc_monthly
+                ohlc = self.period_slice(ohlc[ohlc['symbole'] == symbole_ohlc], controls)
+                ohlc = ohlc_buckets(ohlc, target_points(LARGEUR_PLEINE, PIXELS_PAR_BOUGIE))
+                
+                fig = go.Figure(go.Candlestick(x=ohlc['date'],
+                                               open=ohlc['ouverture'],
+                                               high=ohlc['plus_haut'],
+                                               low=ohlc['plus_bas'],
+                                               close=ohlc['cloture'],
+                                               name=symbole_ohlc))
+                fig.update_layout(title=f'Cours Mensuels OHLC - {self.entreprises[symbole_ohlc]["nom_complet"]}',
+                                  xaxis_rangeslider_visible=False)
+                return fig
+            
+            fig = self.cached_figure('secteurs_ohlc', 'historical_data', controls, chandeliers, symbole=symbole_ohlc)
             st.plotly_chart(fig, use_container_width=True)
         
         with tab3:
@@ -776,11 +1032,94 @@ class MadagascarDashboard:
                 - Productivité variable
                 """)
     
-    def create_economic_analysis(self):
+    def create_risk_analysis(self, controls=None):
+        """Analyse des risques: volatilité, bêta, drawdowns et corrélations sectorielles"""
+        st.markdown('<h3 class="section-header">🛡️ ANALYSE DES RISQUES</h3>', 
+                   unsafe_allow_html=True)
+        
+        risk = self.history.risk
+        fenetre = st.slider("Fenêtre d'analyse (jours de bourse)", 
+                            min_value=21, max_value=JOURS_BOURSE, value=FENETRE_RISQUE, step=21)
+        symboles = controls.get('symboles') if controls else None
+        positions = np.arange(len(risk.symboles)) if symboles is None else symboles
+        
+        # Métriques lues dans les sommes cumulées: coût indépendant de la longueur de l'historique
+        profil = risk.summary(fenetre).iloc[positions]
+        profil.insert(1, 'secteur', [self.entreprises[s]['secteur'] for s in profil['symbole']])
+        
+        tab1, tab2, tab3 = st.tabs(["Profil de Risque", "Volatilité & Drawdowns", "Corrélations Sectorielles"])
+        
+        with tab1:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                fig = self.cached_figure('risques_volatilite_beta', 'historical_data', controls, lambda: px.scatter(
+                    profil, x='beta', y='volatilite_annualisee', color='secteur', hover_name='symbole',
+                    title=f'Volatilité Annualisée vs Bêta ({fenetre} jours)'),
+                    layout=dict(xaxis_title="Bêta / indice", yaxis_title="Volatilité annualisée (%)"),
+                    fenetre=fenetre)
+                st.plotly_chart(fig, use_container_width=True)
+            
+            with col2:
+                fig = self.cached_figure('risques_drawdowns', 'historical_data', controls, lambda: px.bar(
+                    profil.sort_values('drawdown_max'), x='symbole', y=['drawdown', 'drawdown_max'], barmode='group',
+                    title='Drawdown Courant et Maximum (%)'),
+                    fenetre=fenetre)
+                st.plotly_chart(fig, use_container_width=True)
+            
+            st.dataframe(profil.round(2), use_container_width=True, hide_index=True)
+        
+        with tab2:
+            symbole_risque = st.selectbox("Entreprise:", list(profil['symbole']))
+            j = self.history.matrix.positions[symbole_risque]
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                def volatilite_glissante():
+                    serie = risk.rolling_volatility([j], fenetre, annualiser=True)
+                    serie = self.period_slice(serie.rename(columns={symbole_risque: 'volatilite'})
+                                              .rename_axis('date').reset_index(), controls)
+                    return px.line(downsample_line(serie, 'date', 'volatilite', target_points()),
+                                   x='date', 
+                                   y='volatilite',
+                                   title=f'Volatilité Glissante Annualisée - {symbole_risque} ({fenetre} jours)',
+                                   color_discrete_sequence=['#FC3D32'])
+                
+                fig = self.cached_figure('risques_volatilite_glissante', 'historical_data', controls,
+                                         volatilite_glissante, fenetre=fenetre, symbole=symbole_risque)
+                st.plotly_chart(fig, use_container_width=True)
+            
+            with col2:
+                def drawdowns():
+                    dates, prix = self.history.prices()
+                    serie = pd.DataFrame({'date': dates, 'drawdown': drawdown_series(prix[:, j])})
+                    return px.area(downsample_line(self.period_slice(serie, controls), 'date', 'drawdown',
+                                                   target_points()),
+                                   x='date', 
+                                   y='drawdown',
+                                   title=f'Drawdown depuis le Plus Haut - {symbole_risque} (%)',
+                                   color_discrete_sequence=['#660099'])
+                
+                fig = self.cached_figure('risques_drawdown', 'historical_data', controls, drawdowns,
+                                         symbole=symbole_risque)
+                st.plotly_chart(fig, use_container_width=True)
+        
+        with tab3:
+            secteurs = self.active_sectors(controls) or risk.secteurs
+            correlation = risk.sector_correlation(fenetre).loc[sorted(secteurs), sorted(secteurs)]
+            fig = self.cached_figure('risques_correlations', 'historical_data', controls, lambda: px.imshow(
+                correlation.round(2), text_auto=True, zmin=-1, zmax=1, color_continuous_scale='RdYlGn',
+                title=f'Corrélation des Rendements Sectoriels ({fenetre} jours)'),
+                fenetre=fenetre)
+            st.plotly_chart(fig, use_container_width=True)
+    
+    def create_economic_analysis(self, controls=None):
         """Analyse économique approfondie"""
         st.markdown('<h3 class="section-header">💰 ANALYSE ÉCONOMIQUE AVANCÉE</h3>', 
                    unsafe_allow_html=True)
         
+        economic_data = self.period_slice(self.economic_data, controls)
+        
         tab1, tab2, tab3 = st.tabs(["Indicateurs Macro", "Commerce Extérieur", "Développement"])
         
         with tab1:
@@ -788,32 +1127,31 @@ class MadagascarDashboard:
             
             with col1:
                 # Corrélation inflation-croissance (sans LOWESS)
-                fig = px.scatter(self.economic_data, 
+                fig = px.scatter(economic_data, 
                                x='inflation', 
                                y='croissance_pib',
                                title='Relation Inflation vs Croissance du PIB',
                                color_discrete_sequence=['#007E3A'])
                 # Ajout d'une ligne de tendance linéaire simple
-                z = np.polyfit(self.economic_data['inflation'], self.economic_data['croissance_pib'], 1)
-                p = np.poly1d(z)
-                fig.add_traces(go.Scatter(x=self.economic_data['inflation'], 
-                                        y=p(self.economic_data['inflation']),
-                                        mode='lines',
-                                        line=dict(color='red', dash='dash'),
-                                        name='Tendance linéaire'))
+                if len(economic_data) >= 2:
+                    z = np.polyfit(economic_data['inflation'], economic_data['croissance_pib'], 1)
+                    p = np.poly1d(z)
+                    fig.add_traces(go.Scatter(x=economic_data['inflation'], 
+                                            y=p(economic_data['inflation']),
+                                            mode='lines',
+                                            line=dict(color='red', dash='dash'),
+                                            name='Tendance linéaire'))
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Dette publique
-                fig = px.line(self.economic_data, 
-                             x='date', 
-                             y='dette_publique',
-                             title='Évolution de la Dette Publique (% PIB)',
-                             color_discrete_sequence=['#FF6B00'])
+                fig = self.cached_figure('economie_dette', 'economic_data', controls, lambda: px.line(
+                    economic_data, x='date', y='dette_publique', title='Évolution de la Dette Publique (% PIB)',
+                    color_discrete_sequence=['#FF6B00']))
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
                 # Taux d'intérêt réels
-                economic_data_copy = self.economic_data.copy()
+                economic_data_copy = economic_data.copy()
                 economic_data_copy['taux_reel'] = economic_data_copy['taux_directeur'] - economic_data_copy['inflation']
                 
                 fig = px.line(economic_data_copy, 
@@ -824,11 +1162,9 @@ class MadagascarDashboard:
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Réserves de devises
-                fig = px.line(self.economic_data, 
-                             x='date', 
-                             y='reserves_devises',
-                             title='Réserves de Devises (Millions USD)',
-                             color_discrete_sequence=['#004B87'])
+                fig = self.cached_figure('economie_reserves', 'economic_data', controls, lambda: px.line(
+                    economic_data, x='date', y='reserves_devises', title='Réserves de Devises (Millions USD)',
+                    color_discrete_sequence=['#004B87']))
                 st.plotly_chart(fig, use_container_width=True)
         
         with tab2:
@@ -836,25 +1172,27 @@ class MadagascarDashboard:
             
             # Données simulées du commerce extérieur
             dates_commerce = pd.date_range('2020-01-01', datetime.now(), freq='Q')
+            rng = self.dataset_rng('commerce_data')
             commerce_data = []
             
             for date in dates_commerce:
                 commerce_data.append({
                     'date': date,
-                    'exportations': random.uniform(200, 400),
-                    'importations': random.uniform(500, 700),
-                    'balance_commerciale': random.uniform(-300, -100),
-                    'export_vanille': random.uniform(50, 100),
-                    'export_cafe': random.uniform(20, 50),
-                    'export_crevettes': random.uniform(60, 120)
+                    'exportations': rng.uniform(200, 400),
+                    'importations': rng.uniform(500, 700),
+                    'balance_commerciale': rng.uniform(-300, -100),
+                    'export_vanille': rng.uniform(50, 100),
+                    'export_cafe': rng.uniform(20, 50),
+                    'export_crevettes': rng.uniform(60, 120)
                 })
             
             commerce_df = pd.DataFrame(commerce_data)
+            commerce_periode = self.period_slice(commerce_df, controls)
             
             col1, col2 = st.columns(2)
             
             with col1:
-                fig = px.line(commerce_df, 
+                fig = px.line(commerce_periode, 
                              x='date', 
                              y=['exportations', 'importations'],
                              title='Exportations vs Importations (Millions USD)',
@@ -862,7 +1200,7 @@ class MadagascarDashboard:
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
-                fig = px.line(commerce_df, 
+                fig = px.line(commerce_periode, 
                              x='date', 
                              y='balance_commerciale',
                              title='Balance Commerciale (Millions USD)',
@@ -953,7 +1291,11 @@ class MadagascarDashboard:
         # Options d'affichage
         st.sidebar.markdown("### ⚙️ Options")
         auto_refresh = st.sidebar.checkbox("Rafraîchissement automatique", value=True)
+        refresh_interval = st.sidebar.slider("Intervalle de rafraîchissement (s)", 
+                                             min_value=5, max_value=120, value=30, step=5,
+                                             disabled=not auto_refresh)
         show_economic = st.sidebar.checkbox("Afficher indicateurs économiques", value=True)
+        lazy_tabs = st.sidebar.checkbox("Calculer uniquement l'onglet actif", value=True)
         
         # Bouton de rafraîchissement manuel
         if st.sidebar.button("🔄 Rafraîchir les données"):
@@ -986,21 +1328,32 @@ class MadagascarDashboard:
                     f"{data['variation']:+.1f}%"
                 )
         
+        cache_stats = shared_cache.stats()
+        st.sidebar.caption(f"🗄️ Cache données: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                           f"({cache_stats['entries']} jeux en mémoire)")
+        # Rempli en fin de rendu, une fois toutes les figures demandées
+        self.figure_counter = st.sidebar.empty()
+        
         return {
             'date_debut': date_debut,
             'date_fin': date_fin,
             'secteurs_selectionnes': secteurs_selectionnes,
             'auto_refresh': auto_refresh,
-            'show_economic': show_economic
+            'refresh_interval': refresh_interval,
+            'show_economic': show_economic,
+            'lazy_tabs': lazy_tabs
         }
 
     def run_dashboard(self):
         """Exécute le dashboard complet"""
-        # Mise à jour des données live
-        self.update_live_data()
+        # Ajout des seuls jours manquants si le processus a passé minuit
+        self.extend_history()
+        self.figure_savings = 0.0
         
         # Sidebar
         controls = self.create_sidebar()
+        # Sélection sectorielle résolue une fois par rerun en positions de symboles
+        controls['symboles'] = self.resolve_sectors(controls['secteurs_selectionnes'])
         
         # Header
         self.display_header()
@@ -1008,29 +1361,39 @@ class MadagascarDashboard:
         # Métriques clés
         self.display_key_metrics()
         
-        # Navigation par onglets
-        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+        # Navigation par onglets (mode paresseux: changer d'onglet relance le script, seul l'onglet actif est calculé)
+        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
             "📈 Marché", 
             "🏢 Entreprises", 
             "📊 Secteurs", 
+            "🛡️ Risques", 
             "💰 Économie", 
             "💡 Perspectives",
             "ℹ️ À Propos"
-        ])
+        ], key='section', on_change='rerun' if controls['lazy_tabs'] else 'ignore')
         
-        with tab1:
-            self.create_market_overview()
+        # open vaut None hors mode paresseux: toutes les sections sont alors construites
+        if tab1.open is not False:
+            with tab1:
+                self.create_market_overview(controls)
         
-        with tab2:
-            self.create_entreprises_live()
+        if tab2.open is not False:
+            with tab2:
+                self.create_entreprises_live(controls)
         
-        with tab3:
-            self.create_sector_analysis()
+        if tab3.open is not False:
+            with tab3:
+                self.create_sector_analysis(controls)
         
-        with tab4:
-            self.create_economic_analysis()
+        if tab4.open is not False:
+            with tab4:
+                self.create_risk_analysis(controls)
         
-        with tab5:
+        if tab5.open is not False:
+            with tab5:
+                self.create_economic_analysis(controls)
+        
+        with tab6:
             st.markdown("## 💡 PERSPECTIVES ÉCONOMIQUES")
             
             col1, col2 = st.columns(2)
@@ -1085,7 +1448,7 @@ class MadagascarDashboard:
             5. **Intégration Régionale:** Renforcement des échanges dans l'océan Indien
             """)
         
-        with tab6:
+        with tab7:
             st.markdown("## 📋 À propos de ce dashboard")
             st.markdown("""
             Ce dashboard présente une analyse en temps réel des performances économiques 
@@ -1111,6 +1474,7 @@ class MadagascarDashboard:
             **🔒 Confidentialité:** 
             Toutes les données sont agrégées et anonymisées.
             """)
+            st.caption(f"Source des données chargées: {self.source}")
             
             st.markdown("---")
             st.markdown("""
@@ -1120,12 +1484,30 @@ class MadagascarDashboard:
             - Adresse: Antananarivo, Madagascar
             """)
         
+        figure_stats = figure_cache.stats()
+        self.figure_counter.caption(f"🧩 Cache figures: {figure_stats['hits']} hits / {figure_stats['misses']} misses, "
+                                    f"{self.figure_savings * 1e3:.0f} ms de construction évités sur ce rendu")
+        
         # Rafraîchissement automatique
         if controls['auto_refresh']:
-            time.sleep(30)  # Rafraîchissement toutes les 30 secondes
-            st.rerun()
+            self.schedule_refresh(controls['refresh_interval'])
+    
+    def schedule_refresh(self, interval):
+        """Programme le rafraîchissement de la session sans bloquer de thread serveur"""
+        st.session_state['version_affichee'] = self.ticker.version
+        
+        @st.fragment(run_every=interval)
+        def surveiller_carnet():
+            # Relance complète seulement si le ticker a publié un nouvel état du carnet
+            if self.ticker.version != st.session_state.get('version_affichee'):
+                st.rerun()
+        
+        surveiller_carnet()
 
 # Lancement du dashboard
 if __name__ == "__main__":
-    dashboard = MadagascarDashboard()
+    # Un dashboard par session: seul current_data évolue, l'historique vient du cache partagé
+    if 'dashboard' not in st.session_state:
+        st.session_state.dashboard = MadagascarDashboard()
+    dashboard = st.session_state.dashboard
     dashboard.run_dashboard()
\ No newline at end of file
@@ -0,0 +1,82 @@
+# aggregates.py
+"""Agrégats matérialisés de l'historique, mis à jour à chaque extension"""
+import numpy as np
+import pandas as pd
+
+OHLC_COLONNES = ['ouverture', 'plus_haut', 'plus_bas', 'cloture', 'volume']
+
+
+def sector_membership(entreprises):
+    """Secteurs triés et matrice d'appartenance symboles × secteurs (sommes sectorielles = produit matriciel)"""
+    secteurs = [info['secteur'] for info in entreprises.values()]
+    noms = sorted(set(secteurs))
+    membership = np.zeros((len(secteurs), len(noms)))
+    membership[np.arange(len(secteurs)), [noms.index(s) for s in secteurs]] = 1
+    return noms, membership
+
+
+def sector_index(entreprises):
+    """Index secteur → positions (triées) des symboles dans l'ordre de l'univers"""
+    positions = {}
+    for j, info in enumerate(entreprises.values()):
+        positions.setdefault(info['secteur'], []).append(j)
+    return {secteur: np.array(codes, dtype=np.intp) for secteur, codes in positions.items()}
+
+
+class MarketAggregates:
+    """Moyennes sectorielles mensuelles et OHLC mensuels par symbole"""
+
+    def __init__(self, entreprises):
+        self.symboles = list(entreprises)
+        self.secteurs, self._membership = sector_membership(entreprises)
+        self._sector_size = self._membership.sum(axis=0)
+
+        self.sector_monthly = pd.DataFrame(columns=['date', 'secteur', 'prix'])
+        self.ohlc_monthly = pd.DataFrame(columns=['symbole', 'date'] + OHLC_COLONNES)
+        # Sommes et nombre de jours par mois: la moyenne se complète sans relire l'historique
+        self._sector_sums = None
+        self._sector_days = None
+        self._ohlc = None
+
+    def update(self, matrices):
+        """Intègre un bloc de nouveaux jours à partir des matrices (jours × symboles) générées"""
+        mois = matrices['dates'].to_period('M').to_timestamp()
+        self._update_sectors(matrices['prix'], mois)
+        self._update_ohlc(matrices['prix'], matrices['volume'], mois)
+
+    def _update_sectors(self, prix, mois):
+        sommes = pd.DataFrame(prix @ self._membership, index=mois, columns=self.secteurs).groupby(level=0).sum()
+        jours = pd.Series(1.0, index=mois).groupby(level=0).sum()
+        if self._sector_sums is not None:
+            # Seul le mois en cours peut recouvrir l'existant
+            sommes = self._sector_sums.add(sommes, fill_value=0)
+            jours = self._sector_days.add(jours, fill_value=0)
+        self._sector_sums, self._sector_days = sommes, jours
+        moyennes = sommes.div(jours, axis=0) / self._sector_size
+        self.sector_monthly = (moyennes.rename_axis(index='date', columns='secteur')
+                               .stack().rename('prix').reset_index())
+
+    def _update_ohlc(self, prix, volume, mois):
+        mensuel = pd.DataFrame(prix, index=mois, columns=self.symboles).groupby(level=0)
+        blocs = {
+            'ouverture': mensuel.first(),
+            'plus_haut': mensuel.max(),
+            'plus_bas': mensuel.min(),
+            'cloture': mensuel.last(),
+            'volume': pd.DataFrame(volume, index=mois, columns=self.symboles).groupby(level=0).sum()
+        }
+        if self._ohlc is not None:
+            # Fusion du mois commun (ouverture conservée, clôture remplacée, extrêmes combinés)
+            communs = self._ohlc['ouverture'].index.intersection(blocs['ouverture'].index)
+            if len(communs):
+                blocs['ouverture'].loc[communs] = self._ohlc['ouverture'].loc[communs]
+                blocs['plus_haut'].loc[communs] = np.maximum(blocs['plus_haut'].loc[communs],
+                                                             self._ohlc['plus_haut'].loc[communs])
+                blocs['plus_bas'].loc[communs] = np.minimum(blocs['plus_bas'].loc[communs],
+                                                            self._ohlc['plus_bas'].loc[communs])
+                blocs['volume'].loc[communs] += self._ohlc['volume'].loc[communs]
+            blocs = {nom: pd.concat([self._ohlc[nom].drop(communs), bloc]) for nom, bloc in blocs.items()}
+        self._ohlc = blocs
+        long = pd.concat({nom: bloc.rename_axis(index='date', columns='symbole').stack()
+                          for nom, bloc in blocs.items()}, axis=1)
+        self.ohlc_monthly = long.swaplevel().sort_index().reset_index()
@@ -0,0 +1,105 @@
+# bars.py
+"""Barres intraday OHLCV (1 min, 5 min, 1 h) de la séance en cours, construites tick par tick"""
+from datetime import datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+
+from ticks import local_offset
+
+# Périodes des barres (secondes), alignées sur l'heure locale
+PERIODES_BARRES = {'1min': 60, '5min': 300, '1h': 3600}
+CHAMPS_BARRES = ('ouverture', 'plus_haut', 'plus_bas', 'cloture', 'volume')
+
+
+class BarBuilder:
+    """Barre en cours d'une période pour chaque symbole, complétée en O(1) par symbole modifié"""
+
+    def __init__(self, n, periode):
+        self.periode = periode
+        self.debut = None
+        self.ouverture = np.full(n, np.nan)
+        self.plus_haut = np.full(n, np.nan)
+        self.plus_bas = np.full(n, np.nan)
+        self.cloture = np.full(n, np.nan)
+        self.volume = np.zeros(n)
+        # Symboles ayant reçu au moins un tick dans la barre en cours
+        self.actif = np.zeros(n, dtype=bool)
+        # Barres terminées de la séance: (début, positions des symboles actifs, champs OHLCV)
+        self.terminees = []
+
+    def update(self, idx, horodatage, prix, volume):
+        """Intègre un tick (heure locale en secondes) pour les positions idx"""
+        debut = horodatage - horodatage % self.periode
+        if debut != self.debut:
+            self.roll()
+            self.debut = debut
+        # Premier tick de la barre pour ces symboles: il l'ouvre
+        nouveaux = ~self.actif[idx]
+        if nouveaux.any():
+            ouverts = idx[nouveaux]
+            self.ouverture[ouverts] = prix[nouveaux]
+            self.plus_haut[ouverts] = prix[nouveaux]
+            self.plus_bas[ouverts] = prix[nouveaux]
+            self.volume[ouverts] = 0
+            self.actif[ouverts] = True
+        self.plus_haut[idx] = np.maximum(self.plus_haut[idx], prix)
+        self.plus_bas[idx] = np.minimum(self.plus_bas[idx], prix)
+        self.cloture[idx] = prix
+        self.volume[idx] += volume
+
+    def roll(self):
+        """Termine la barre en cours (coût proportionnel aux seuls symboles actifs)"""
+        positions = np.flatnonzero(self.actif)
+        if len(positions):
+            self.terminees.append((self.debut, positions,
+                                   {champ: getattr(self, champ)[positions] for champ in CHAMPS_BARRES}))
+            self.actif[positions] = False
+
+    def frame(self, symboles, position=None):
+        """Barres de la séance en table longue (date, symbole, OHLCV), barre en cours comprise"""
+        barres = list(self.terminees)
+        if self.actif.any():
+            positions = np.flatnonzero(self.actif)
+            barres.append((self.debut, positions,
+                           {champ: getattr(self, champ)[positions] for champ in CHAMPS_BARRES}))
+        if position is not None:
+            barres = [(debut, positions[positions == position], {c: v[positions == position] for c, v in champs.items()})
+                      for debut, positions, champs in barres]
+        if not barres:
+            return pd.DataFrame({colonne: [] for colonne in ('date', 'symbole') + CHAMPS_BARRES})
+        positions = np.concatenate([p for _, p, _ in barres])
+        colonnes = {'date': pd.to_datetime(np.repeat([d for d, _, _ in barres], [len(p) for _, p, _ in barres]),
+                                           unit='s'),
+                    'symbole': np.asarray(symboles, dtype=object)[positions]}
+        colonnes.update({champ: np.concatenate([c[champ] for _, _, c in barres]) for champ in CHAMPS_BARRES})
+        return pd.DataFrame(colonnes)
+
+
+class BarAggregator:
+    """Barres de toutes les périodes pour la séance en cours (jour calendaire local)"""
+
+    def __init__(self, symboles, horodatage, periodes=PERIODES_BARRES):
+        self.symboles = list(symboles)
+        self.periodes = periodes
+        self.start_session(horodatage)
+
+    def start_session(self, horodatage):
+        """Ouvre la séance du jour de horodatage, barres vides"""
+        jour = datetime.fromtimestamp(horodatage).date()
+        self.date = pd.Timestamp(jour)
+        self.debut_seance = datetime.combine(jour, time()).timestamp()
+        self.fin_seance = datetime.combine(jour + timedelta(days=1), time()).timestamp()
+        self.decalage = local_offset(horodatage)
+        self.builders = {nom: BarBuilder(len(self.symboles), periode) for nom, periode in self.periodes.items()}
+
+    def record(self, idx, horodatage, prix, volume):
+        """Intègre un tick: prix des positions idx et volume échangé depuis leur tick précédent"""
+        # Ticks reçus avant l'ouverture (séance close par anticipation): comptés dans la première barre
+        local = max(horodatage, self.debut_seance) + self.decalage
+        for builder in self.builders.values():
+            builder.update(idx, local, prix, volume)
+
+    def frame(self, nom, position=None):
+        """Barres de la séance pour une période, barre en cours comprise"""
+        return self.builders[nom].frame(self.symboles, position)
@@ -0,0 +1,655 @@
+# benchmark.py
+"""Mesures de performance des composants du dashboard
+
+Usage: python benchmark.py [nom ...]   (sans argument: tous les benchmarks)
+"""
+import argparse
+import heapq
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import requests
+
+from bars import PERIODES_BARRES, BarAggregator
+from downsampling import LARGEUR_PLEINE, PIXELS_PAR_BOUGIE, downsample_line, ohlc_buckets, target_points
+from simulation import DEFAULT_SEED, HISTORY_START, generate_price_matrices, matrices_to_frame, synthetic_entreprises
+from history import PriceHistory
+from parallel import generate_price_matrices_parallel
+from risk import RiskAnalytics
+from scheduler import RefreshScheduler
+from screener import SavedScreen, Screener
+from sources import HttpQuoteFeed, MockQuoteServer
+from storage import DataStore
+from streaming import QuotePipeline, TickProducer
+from tick_engine import TickEngine
+from ticks import TickRing
+
+
+def chrono(fonction, *args, repetitions=1, **kwargs):
+    """Retourne le meilleur temps (secondes) et le résultat de la fonction"""
+    meilleur = float('inf')
+    resultat = None
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction(*args, **kwargs)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur, resultat
+
+
+def legacy_historical_data(entreprises, dates):
+    """Ancienne génération ligne par ligne (référence)"""
+    data = []
+    for date in dates:
+        for symbole, info in entreprises.items():
+            base_price = info['market_cap'] / 1e6 * random.uniform(0.1, 0.3)
+            if date.year == 2020 and date.month <= 6:
+                covid_impact = random.uniform(0.3, 0.6)
+            elif date.year == 2020:
+                covid_impact = random.uniform(0.6, 0.9)
+            elif date.year == 2021:
+                covid_impact = random.uniform(0.9, 1.2)
+            else:
+                covid_impact = random.uniform(1.0, 1.4)
+            daily_volatility = random.uniform(0.92, 1.08)
+            prix = base_price * covid_impact * daily_volatility * random.uniform(0.95, 1.05)
+            volume = info['volume_moyen'] * random.uniform(0.3, 3.0)
+            data.append({
+                'date': date,
+                'symbole': symbole,
+                'prix': prix,
+                'volume': volume,
+                'secteur': info['secteur'],
+                'market_cap': info['market_cap'] * random.uniform(0.9, 1.1)
+            })
+    return pd.DataFrame(data)
+
+
+def vectorized_historical_data(entreprises, dates):
+    """Génération vectorisée actuelle"""
+    matrices = generate_price_matrices(entreprises, dates, np.random.default_rng(DEFAULT_SEED))
+    return matrices_to_frame(matrices, entreprises)
+
+
+def bench_historique():
+    """Démarrage à froid de initialize_historical_data pour 5, 20 et 50 ans"""
+    entreprises = synthetic_entreprises(10)
+    print(f"{'années':>7} {'lignes':>10} {'boucle (s)':>11} {'vectorisé (s)':>14} {'gain':>7}")
+    for annees in (5, 20, 50):
+        dates = pd.date_range(HISTORY_START, periods=365 * annees, freq='D')
+        t_boucle, _ = chrono(legacy_historical_data, entreprises, dates)
+        t_vect, frame = chrono(vectorized_historical_data, entreprises, dates, repetitions=3)
+        print(f"{annees:>7} {len(frame):>10,} {t_boucle:>11.3f} {t_vect:>14.4f} {t_boucle / t_vect:>6.0f}x")
+
+
+def quote_frame(entreprises, rng):
+    """Carnet de cotations au format de initialize_current_data"""
+    n = len(entreprises)
+    infos = pd.DataFrame.from_dict(entreprises, orient='index')
+    dernier_prix = infos['market_cap'].to_numpy() / 1e6 * rng.uniform(0.1, 0.3, n)
+    change_pct = rng.uniform(-0.03, 0.03, n)
+    ouverture = dernier_prix * (1 + change_pct)
+    return pd.DataFrame({
+        'symbole': infos.index.to_numpy(dtype=object),
+        'nom_complet': infos['nom_complet'].to_numpy(),
+        'secteur': infos['secteur'].to_numpy(),
+        'prix_actuel': ouverture,
+        'variation_pct': change_pct * 100,
+        'variation_abs': np.zeros(n),
+        'volume': infos['volume_moyen'].to_numpy() * rng.uniform(0.05, 0.2, n),
+        'market_cap': infos['market_cap'].to_numpy(),
+        'dividende_yield': infos['dividende_yield'].to_numpy(),
+        'poids_indice': infos['poids_indice'].to_numpy(),
+        'ouverture': ouverture,
+        'plus_haut': ouverture,
+        'plus_bas': ouverture
+    })
+
+
+def legacy_update_live_data(current_data):
+    """Ancienne mise à jour cellule par cellule via .loc (référence)"""
+    for idx in current_data.index:
+        if random.random() < 0.4:
+            variation = random.uniform(-0.04, 0.04)
+            nouveau_prix = current_data.loc[idx, 'prix_actuel'] * (1 + variation)
+            current_data.loc[idx, 'prix_actuel'] = nouveau_prix
+            current_data.loc[idx, 'variation_pct'] = variation * 100
+            current_data.loc[idx, 'variation_abs'] = nouveau_prix - current_data.loc[idx, 'ouverture']
+            if nouveau_prix > current_data.loc[idx, 'plus_haut']:
+                current_data.loc[idx, 'plus_haut'] = nouveau_prix
+            if nouveau_prix < current_data.loc[idx, 'plus_bas']:
+                current_data.loc[idx, 'plus_bas'] = nouveau_prix
+            current_data.loc[idx, 'volume'] *= random.uniform(0.8, 1.3)
+
+
+def bench_tick():
+    """Coût d'un tick de update_live_data: boucle .loc contre moteur en colonnes"""
+    rng = np.random.default_rng(DEFAULT_SEED)
+    print(f"{'symboles':>9} {'boucle .loc (ms)':>17} {'tick (ms)':>10} {'tick+vue (ms)':>14} {'gain':>7}")
+    for n in (10, 1_000, 10_000, 100_000):
+        quotes = quote_frame(synthetic_entreprises(n), rng)
+        if n <= 10_000:
+            t_boucle, _ = chrono(legacy_update_live_data, quotes.copy())
+        else:
+            t_boucle = float('nan')
+        engine = TickEngine(quotes, rng=rng)
+        t_tick, _ = chrono(engine.tick, repetitions=20)
+
+        def tick_et_vue():
+            engine.tick()
+            return engine.frame()
+        t_vue, _ = chrono(tick_et_vue, repetitions=5)
+        print(f"{n:>9,} {t_boucle * 1e3:>17.1f} {t_tick * 1e3:>10.3f} {t_vue * 1e3:>14.2f} "
+              f"{t_boucle / t_tick:>6.0f}x")
+
+
+def simulate_sessions(n_sessions, bloquant, engine, workers=16, intervalle=0.25, duree=2.0):
+    """Simule n sessions auto-rafraîchies sur un pool de threads serveur, retourne la part servie"""
+    rendus = [0] * n_sessions
+    echeances = []
+    condition = threading.Condition()
+    fin = time.monotonic() + duree
+
+    def planifier(session, quand):
+        with condition:
+            heapq.heappush(echeances, (quand, session))
+            condition.notify()
+
+    def rendu(session):
+        engine.frame()
+        rendus[session] += 1
+        if bloquant:
+            # Ancien comportement: time.sleep dans le script puis st.rerun()
+            time.sleep(intervalle)
+            if time.monotonic() < fin:
+                pool.submit(rendu, session)
+        else:
+            planifier(session, time.monotonic() + intervalle)
+
+    def distribuer():
+        # Équivalent du run_every des fragments: un seul thread arme les relances
+        while time.monotonic() < fin:
+            with condition:
+                while echeances and echeances[0][0] <= time.monotonic():
+                    pool.submit(rendu, heapq.heappop(echeances)[1])
+                condition.wait(0.005)
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    for session in range(n_sessions):
+        pool.submit(rendu, session)
+    if not bloquant:
+        distribuer()
+    time.sleep(max(0.0, fin - time.monotonic()))
+    pool.shutdown(wait=False, cancel_futures=True)
+    attendus = duree / intervalle
+    return sum(r >= 0.8 * attendus for r in rendus) / n_sessions
+
+
+def bench_sessions():
+    """Test de charge: sessions simultanées servies par un processus (16 threads serveur)"""
+    rng = np.random.default_rng(DEFAULT_SEED)
+    engine = TickEngine(quote_frame(synthetic_entreprises(10), rng), rng=rng)
+    ticker = RefreshScheduler(engine, interval=0.05).start()
+    print(f"{'sessions':>9} {'time.sleep servies':>19} {'scheduler servies':>18}")
+    soutenues = {True: 0, False: 0}
+    for n in (8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096):
+        parts = {}
+        for bloquant in (True, False):
+            parts[bloquant] = simulate_sessions(n, bloquant, engine)
+            if parts[bloquant] == 1.0:
+                soutenues[bloquant] = n
+        print(f"{n:>9} {parts[True]:>18.0%} {parts[False]:>18.0%}")
+    ticker.stop()
+    print(f"sessions soutenues: avant {soutenues[True]}, après {soutenues[False]}")
+
+
+def bench_matrice():
+    """Table longue (masques/groupby) contre matrice large (jours × symboles), 5 ans d'historique"""
+    fin = pd.Timestamp(HISTORY_START) + pd.DateOffset(years=5)
+    print(f"{'symboles':>9} {'opération':>22} {'long (ms)':>10} {'large (ms)':>11} {'gain':>7}")
+    for n in (10, 100, 1_000):
+        entreprises = synthetic_entreprises(n)
+        history = PriceHistory(entreprises, DEFAULT_SEED)
+        history.extend(fin)
+        frame, matrix = history.frame, history.matrix
+        secteurs = np.array([entreprises[s]['secteur'] for s in matrix.symboles])
+        poids = np.array([entreprises[s]['poids_indice'] for s in matrix.symboles])
+        echantillon = matrix.symboles[:10]
+
+        operations = {
+            'indice quotidien': (
+                lambda: frame.groupby('date')['prix'].mean(),
+                lambda: matrix.prix.mean(axis=1)),
+            'indice pondéré': (
+                lambda: frame.assign(p=frame['prix'] * frame['symbole'].map(dict(zip(matrix.symboles, poids))))
+                .groupby('date')['p'].sum() / poids.sum(),
+                lambda: matrix.prix @ poids / poids.sum()),
+            'moyennes sectorielles': (
+                lambda: frame.groupby(['date', 'secteur'])['prix'].mean(),
+                lambda: {s: matrix.prix[:, secteurs == s].mean(axis=1) for s in np.unique(secteurs)}),
+            'dernier prix (10 sym.)': (
+                lambda: [frame[frame['symbole'] == s].iloc[-1]['prix'] for s in echantillon],
+                lambda: [matrix.prix[-1, matrix.positions[s]] for s in echantillon]),
+        }
+        for nom, (long, large) in operations.items():
+            t_long, _ = chrono(long, repetitions=3)
+            t_large, _ = chrono(large, repetitions=3)
+            print(f"{n:>9,} {nom:>22} {t_long * 1e3:>10.2f} {t_large * 1e3:>11.3f} {t_long / t_large:>6.0f}x")
+
+
+def bench_demarrage():
+    """Amorçage du carnet live: dernier prix par symbole (scan, colonne de matrice, index des dernières lignes)"""
+    fin = pd.Timestamp(HISTORY_START) + pd.DateOffset(years=5)
+    print(f"{'symboles':>9} {'historique (s)':>15} {'scan (ms)':>10} {'colonne (ms)':>13} {'index (ms)':>11}")
+    for n in (10, 100, 1_000):
+        entreprises = synthetic_entreprises(n)
+        history = PriceHistory(entreprises, DEFAULT_SEED)
+        t_historique, _ = chrono(history.extend, fin)
+        frame = history.frame
+        symboles = list(entreprises)
+        # Le scan est O(symboles × lignes): mesuré sur 20 symboles puis extrapolé
+        echantillon = symboles[:20]
+        t_scan, scans = chrono(lambda: [frame[frame['symbole'] == s].iloc[-1]['prix'] for s in echantillon])
+        t_scan *= len(symboles) / len(echantillon)
+        matrix = history.matrix
+        t_colonne, colonnes = chrono(lambda: [matrix.prix[-1, matrix.positions[s]] for s in symboles], repetitions=5)
+        t_index, index = chrono(lambda: [history.latest_row(s)['prix'] for s in symboles], repetitions=5)
+        assert np.allclose(scans, index[:len(echantillon)]) and np.allclose(colonnes, index)
+        print(f"{n:>9,} {t_historique:>15.3f} {t_scan * 1e3:>10.1f} {t_colonne * 1e3:>13.3f} {t_index * 1e3:>11.3f}")
+
+
+def bench_stockage():
+    """Démarrage à froid: simulation complète contre réouverture du magasin local (.npy mappés)"""
+    print(f"{'symboles':>9} {'années':>7} {'simulation (s)':>15} {'magasin (s)':>12} {'matrices seules (ms)':>21}")
+    with tempfile.TemporaryDirectory() as racine:
+        store = DataStore(racine)
+        for n, annees in ((10, 5), (100, 20), (1_000, 10)):
+            entreprises = synthetic_entreprises(n)
+            fin = pd.Timestamp(HISTORY_START) + pd.DateOffset(years=annees)
+
+            def simulation():
+                history = PriceHistory(entreprises, DEFAULT_SEED)
+                history.extend(fin)
+                return history
+            t_simulation, history = chrono(simulation)
+            store.save_history(history)
+
+            t_magasin, _ = chrono(store.load_history, entreprises, DEFAULT_SEED, HISTORY_START, repetitions=3)
+            # Ouverture des seuls fichiers (sans reconstruire table longue ni agrégats)
+            t_matrices, _ = chrono(store._read, store.dataset_dir('historical_data', entreprises, DEFAULT_SEED),
+                                   DEFAULT_SEED, repetitions=3)
+            print(f"{n:>9,} {annees:>7} {t_simulation:>15.3f} {t_magasin:>12.3f} {t_matrices * 1e3:>21.2f}")
+
+
+def bench_echantillonnage():
+    """Graphiques longs: série complète contre réduction LTTB / bougies fusionnées (taille JSON et rendu)"""
+    entreprises = synthetic_entreprises(10)
+    print(f"{'années':>7} {'graphique':>10} {'points':>15} {'JSON (Ko)':>14} {'rendu (ms)':>15} "
+          f"{'amplitude conservée':>20}")
+    for annees in (5, 20, 50):
+        history = PriceHistory(entreprises, DEFAULT_SEED)
+        history.extend(pd.Timestamp(HISTORY_START) + pd.DateOffset(years=annees))
+        indice = history.index.levels
+        # Bougies hebdomadaires d'un symbole comme série OHLC longue
+        semaines = pd.Series(history.matrix.prix[:, 0], index=history.dates).resample('W')
+        bougies = pd.DataFrame({'ouverture': semaines.first(), 'plus_haut': semaines.max(),
+                                'plus_bas': semaines.min(), 'cloture': semaines.last()}).rename_axis('date')
+        bougies = bougies.reset_index()
+
+        cas = {
+            'ligne': (lambda serie: px.line(serie, x='date', y='indice').to_json(),
+                      indice, downsample_line(indice, 'date', 'indice', target_points()),
+                      lambda serie: np.ptp(serie['indice'])),
+            'ohlc': (lambda serie: go.Figure(go.Candlestick(x=serie['date'], open=serie['ouverture'],
+                                                            high=serie['plus_haut'], low=serie['plus_bas'],
+                                                            close=serie['cloture'])).to_json(),
+                     bougies, ohlc_buckets(bougies, target_points(LARGEUR_PLEINE, PIXELS_PAR_BOUGIE)),
+                     lambda serie: serie['plus_haut'].max() - serie['plus_bas'].min()),
+        }
+        for nom, (rendu, complet, reduit, amplitude) in cas.items():
+            t_complet, json_complet = chrono(rendu, complet, repetitions=3)
+            t_reduit, json_reduit = chrono(rendu, reduit, repetitions=3)
+            print(f"{annees:>7} {nom:>10} {len(complet):>6,} → {len(reduit):>5,} "
+                  f"{len(json_complet) / 1024:>6.0f} → {len(json_reduit) / 1024:>4.0f} "
+                  f"{t_complet * 1e3:>6.1f} → {t_reduit * 1e3:>5.1f} {amplitude(reduit) / amplitude(complet):>20.1%}")
+
+
+def legacy_screen(current_data, volatilite, min_market_cap, min_dividende, max_volatilite, min_performance,
+                  secteurs):
+    """Ancien screener: copie du carnet puis filtres booléens chaînés (référence)"""
+    entreprises_filtrees = current_data.assign(volatilite=volatilite)
+    entreprises_filtrees = entreprises_filtrees[entreprises_filtrees['market_cap'] >= min_market_cap]
+    entreprises_filtrees = entreprises_filtrees[entreprises_filtrees['dividende_yield'] >= min_dividende]
+    entreprises_filtrees = entreprises_filtrees[entreprises_filtrees['volatilite'] <= max_volatilite]
+    entreprises_filtrees = entreprises_filtrees[entreprises_filtrees['variation_pct'] >= min_performance]
+    return entreprises_filtrees[entreprises_filtrees['secteur'].isin(secteurs)]
+
+
+def bench_screener():
+    """Screener: filtres chaînés sur copie contre index triés, et écran sauvegardé réévalué après un tick"""
+    rng = np.random.default_rng(DEFAULT_SEED)
+    print(f"{'symboles':>9} {'résultats':>10} {'chaîné (ms)':>12} {'indexé (ms)':>12} {'écran complet (ms)':>19} "
+          f"{'écran après tick (ms)':>22}")
+    for n in (1_000, 10_000, 100_000):
+        quotes = quote_frame(synthetic_entreprises(n), rng)
+        volatilite = rng.uniform(30, 60, n)
+        engine = TickEngine(quotes, rng=rng)
+        screener = Screener(engine, volatilite)
+        criteres = {'market_cap': (250e6, None), 'dividende_yield': (2.0, None), 'volatilite': (None, 50),
+                    'variation_pct': (0.0, None)}
+        secteurs = ('Finance', 'Mines', 'Tourisme')
+
+        t_chaine, reference = chrono(legacy_screen, engine.frame(), volatilite, 250e6, 2.0, 50, 0.0, secteurs,
+                                     repetitions=5)
+        t_index, positions = chrono(screener.screen, criteres, secteurs, repetitions=5)
+        assert np.array_equal(positions, reference.index.to_numpy())
+        t_complet, _ = chrono(lambda: SavedScreen(screener, criteres, secteurs).refresh(), repetitions=5)
+        ecran = SavedScreen(screener, criteres, secteurs)
+        ecran.refresh()
+
+        t_tick = float('inf')
+        for _ in range(5):
+            engine.tick()
+            t_tick = min(t_tick, chrono(ecran.refresh)[0])
+        print(f"{n:>9,} {len(positions):>10,} {t_chaine * 1e3:>12.2f} {t_index * 1e3:>12.3f} {t_complet * 1e3:>19.3f} "
+              f"{t_tick * 1e3:>22.3f}")
+
+
+def bench_risque():
+    """Métriques de risque: fenêtres pandas sur la table longue contre sommes cumulées incrémentales"""
+    fin = pd.Timestamp(HISTORY_START) + pd.DateOffset(years=10)
+    print(f"{'symboles':>9} {'pandas rolling (ms)':>19} {'sommes cumulées (ms)':>21} {'recalcul complet (ms)':>22} "
+          f"{'ajout 1 jour, amorti (ms)':>26}")
+    for n in (10, 100, 1_000):
+        entreprises = synthetic_entreprises(n)
+        history = PriceHistory(entreprises, DEFAULT_SEED)
+        history.extend(fin)
+        frame, block = history.frame, history.matrix.block()
+        poids = pd.Series({symbole: info['poids_indice'] for symbole, info in entreprises.items()})
+        indice = history.index.levels['indice'].to_numpy()
+
+        def pandas_rolling():
+            prix = frame.pivot(index='date', columns='symbole', values='prix')
+            rendements = np.log(prix).diff()
+            marche = np.log(prix @ poids[prix.columns]).diff()
+            volatilite = rendements.rolling(63).std().iloc[-1]
+            beta = rendements.rolling(252).cov(marche).iloc[-1] / marche.rolling(252).var().iloc[-1]
+            drawdown = (prix / prix.cummax() - 1).min()
+            return volatilite, beta, drawdown
+        t_pandas, (volatilite, beta, _) = chrono(pandas_rolling)
+
+        risk = history.risk
+        t_cumul, _ = chrono(lambda: (risk.volatility(63), risk.beta(252), risk.max_drawdown), repetitions=5)
+        assert np.allclose(risk.volatility(63), volatilite.to_numpy() * 100) and np.allclose(risk.beta(252), beta)
+
+        def recalcul():
+            complet = RiskAnalytics(entreprises)
+            complet.update(block, indice)
+            return complet
+        t_complet, _ = chrono(recalcul)
+        # Coût amorti d'un jour sur 30 ajouts successifs (inclut les réallocations par doublement)
+        debut = time.perf_counter()
+        for k in range(1, 31):
+            prix = block['prix'][-k:][:1]
+            risk.update({'dates': block['dates'][-1:] + pd.Timedelta(days=k), 'prix': prix}, prix @ poids.to_numpy())
+        t_jour = (time.perf_counter() - debut) / 30
+        print(f"{n:>9,} {t_pandas * 1e3:>19.1f} {t_cumul * 1e3:>21.3f} {t_complet * 1e3:>22.1f} {t_jour * 1e3:>26.3f}")
+
+
+def bench_indice():
+    """Indice MVM pondéré: somme complète du carnet à chaque tick contre mise à jour des seuls symboles modifiés"""
+    rng = np.random.default_rng(DEFAULT_SEED)
+    print(f"{'symboles':>9} {'probabilité':>12} {'somme complète (µs)':>20} {'écarts seuls (µs)':>18} "
+          f"{'on_tick (µs)':>13} {'écart relatif':>14}")
+    for n in (1_000, 10_000, 100_000):
+        entreprises = synthetic_entreprises(n)
+        history = PriceHistory(entreprises, DEFAULT_SEED)
+        history.extend(pd.Timestamp(HISTORY_START) + pd.DateOffset(days=30))
+        index = history.index
+        for probabilite in (0.4, 0.2, 0.1, 0.01):
+            engine = TickEngine(quote_frame(entreprises, rng), rng=rng, probabilite=probabilite)
+            # Niveau live amorcé sur le carnet initial, puis ticks enregistrés pour rejouer les deux calculs
+            index.attach(engine)
+            index.detach()
+            ticks = [(engine.tick(), engine.prix.copy()) for _ in range(50)]
+
+            def complet():
+                for _, prix in ticks:
+                    ponderes = prix * index.poids
+                    ponderes.sum() / index.diviseur
+                    np.bincount(index.codes, weights=ponderes) / index.diviseurs_secteurs
+            t_complet, _ = chrono(complet, repetitions=3)
+            # Chemin O(modifiés) forcé, puis on_tick qui choisit selon PART_INCREMENTALE
+            index.attach(engine)
+            index.detach()
+            t_ecarts, _ = chrono(lambda: [index._apply_deltas(idx, prix) for idx, prix in ticks])
+            index.attach(engine)
+            index.detach()
+            t_incremental, _ = chrono(lambda: [index.on_tick(idx, prix) for idx, prix in ticks])
+            exact = (engine.prix * index.poids).sum() / index.diviseur
+            print(f"{n:>9,} {probabilite:>12.0%} {t_complet / len(ticks) * 1e6:>20.1f} "
+                  f"{t_ecarts / len(ticks) * 1e6:>18.1f} {t_incremental / len(ticks) * 1e6:>13.1f} "
+                  f"{abs(index.live_level() / exact - 1):>14.1e}")
+
+
+def bench_parallele():
+    """Génération des matrices d'un grand univers: séquentielle contre shards répartis sur 1 à N processus"""
+    dates = pd.date_range(HISTORY_START, periods=365 * 2, freq='D')
+    coeurs = sorted({1, *(2 ** k for k in range(1, 8) if 2 ** k < os.cpu_count()), os.cpu_count()})
+    print(f"{'symboles':>9} {'séquentiel (s)':>15} " + " ".join(f"{f'{c} proc. (s)':>12}" for c in coeurs))
+    for n in (1_000, 5_000, 10_000):
+        entreprises = synthetic_entreprises(n)
+        t_sequentiel, _ = chrono(generate_price_matrices, entreprises, dates, np.random.default_rng(DEFAULT_SEED))
+        temps, reference = [], None
+        for workers in coeurs:
+            t, matrices = chrono(generate_price_matrices_parallel, entreprises, dates, DEFAULT_SEED, workers)
+            # Shards de taille fixe: résultat identique quel que soit le nombre de processus
+            if reference is None:
+                reference = matrices['prix']
+            assert np.array_equal(matrices['prix'], reference)
+            temps.append(t)
+        print(f"{n:>9,} {t_sequentiel:>15.3f} " + " ".join(f"{t:>12.3f}" for t in temps))
+
+
+def bench_sources():
+    """Flux de cotations HTTP local: une requête par symbole contre lots sur connexions réutilisées"""
+    print(f"{'symboles':>9} {'par symbole (s)':>16} {'requêtes':>9} {'par lots (s)':>13} {'requêtes':>9} "
+          f"{'avec 20% de 503 (s)':>20} {'erreurs reprises':>17}")
+    for n in (100, 1_000, 5_000):
+        entreprises = synthetic_entreprises(n)
+        symboles = list(entreprises)
+        with MockQuoteServer(entreprises, latence=0.002, seed=DEFAULT_SEED) as serveur:
+            # Référence: une connexion et une requête par symbole
+            t_symbole, _ = chrono(lambda: [requests.get(f'{serveur.url}/quotes', params={'symboles': s}, timeout=5)
+                                           for s in symboles])
+            requetes_symbole, serveur.requetes = serveur.requetes, 0
+
+            flux = HttpQuoteFeed(serveur.url)
+            t_lots, cotations = chrono(flux.quotes, symboles)
+            assert not np.isnan(cotations['prix']).any()
+            requetes_lots = serveur.requetes
+
+            serveur.taux_erreur = 0.2
+            t_erreurs, cotations = chrono(flux.quotes, symboles)
+            assert not np.isnan(cotations['prix']).any()
+            flux.close()
+        print(f"{n:>9,} {t_symbole:>16.3f} {requetes_symbole:>9,} {t_lots:>13.3f} {requetes_lots:>9,} "
+              f"{t_erreurs:>20.3f} {serveur.erreurs:>17,}")
+
+
+def bench_streaming():
+    """Pipeline asyncio: débit de ticks lus sur TCP, regroupement par symbole et âge des instantanés publiés"""
+    rng = np.random.default_rng(DEFAULT_SEED)
+    duree = 3
+    print(f"{'symboles':>9} {'images/s':>9} {'ticks/s':>11} {'cotations/image':>16} {'regroupement':>13} "
+          f"{'âge médian (ms)':>16} {'âge max (ms)':>13}")
+    for n in (100, 10_000):
+        entreprises = synthetic_entreprises(n)
+        for frequence in (5, 20):
+            engine = TickEngine(quote_frame(entreprises, rng), rng=rng)
+            with TickProducer(entreprises, seed=DEFAULT_SEED) as producteur:
+                pipeline = QuotePipeline(engine, '127.0.0.1', producteur.port, frequence).start()
+                time.sleep(duree)
+                pipeline.stop()
+            latences = np.array(pipeline.latences) * 1e3
+            print(f"{n:>9,} {pipeline.images / duree:>9.1f} {pipeline.ticks / duree:>11,.0f} "
+                  f"{pipeline.cotations / max(pipeline.images, 1):>16,.0f} "
+                  f"{pipeline.ticks / max(pipeline.cotations, 1):>12.1f}x "
+                  f"{np.median(latences):>16.1f} {latences.max():>13.1f}")
+
+
+def legacy_frame(engine):
+    """Ancienne vue du carnet: copie de toutes les colonnes dans un DataFrame neuf (référence)"""
+    frame = engine.static.copy()
+    for colonne, valeurs in engine.snapshot().colonnes.items():
+        if colonne not in frame:
+            frame[colonne] = valeurs.copy()
+    return frame[engine.columns]
+
+
+def bench_instantanes():
+    """Un tick par rafraîchissement: carnet par session contre carnet partagé et instantanés copie-sur-écriture"""
+    rng = np.random.default_rng(DEFAULT_SEED)
+    print(f"{'symboles':>9} {'sessions':>9} {'carnet par session (ms)':>24} {'carnet partagé (ms)':>20} {'gain':>7}")
+    for n in (10, 1_000, 10_000):
+        quotes = quote_frame(synthetic_entreprises(n), rng)
+        for sessions in (1, 10, 100):
+            # Avant: chaque session avance son propre carnet puis en recopie une vue
+            carnets = [TickEngine(quotes, rng=rng) for _ in range(sessions)]
+            t_avant, _ = chrono(lambda: [(carnet.tick(), legacy_frame(carnet)) for carnet in carnets], repetitions=3)
+            # Après: un seul tick, puis N lectures du même instantané
+            engine = TickEngine(quotes, rng=rng)
+            t_apres, _ = chrono(lambda: (engine.tick(), [engine.snapshot().frame for _ in range(sessions)]),
+                                repetitions=3)
+            print(f"{n:>9,} {sessions:>9} {t_avant * 1e3:>24.2f} {t_apres * 1e3:>20.3f} {t_avant / t_apres:>6.0f}x")
+
+    # Un instantané publié ne bouge plus, même après les ticks suivants
+    instantane = engine.snapshot()
+    prix = instantane['prix_actuel'].copy()
+    engine.tick()
+    assert np.array_equal(instantane['prix_actuel'], prix) and not instantane['prix_actuel'].flags.writeable
+
+
+def bench_intraday():
+    """Historique des ticks: listes par symbole (croissance illimitée) contre tampon circulaire préalloué"""
+    rng = np.random.default_rng(DEFAULT_SEED)
+    ticks = 5_000
+    capacite = 1024
+    print(f"{'symboles':>9} {'listes (µs/tick)':>17} {'tampon (µs/tick)':>17} {'listes (Mo)':>12} "
+          f"{'tampon (Mo)':>12} {'fenêtre 100 (µs)':>17}")
+    for n in (10, 1_000, 10_000):
+        changements = [np.flatnonzero(rng.random(n) < 0.4) for _ in range(ticks)]
+        prix = rng.uniform(10, 100, n)
+        volume = rng.uniform(1e3, 1e5, n)
+
+        # Avant: chaque tick ajoute un tuple dans la liste du symbole
+        historiques = [[] for _ in range(n)]
+
+        def listes():
+            for t, idx in enumerate(changements):
+                for j, p, v in zip(idx.tolist(), prix[idx].tolist(), volume[idx].tolist()):
+                    historiques[j].append((float(t), p, v))
+        t_listes, _ = chrono(listes)
+        # Taille des tuples et des flottants conservés (les listes seules sous-estimeraient)
+        memoire_listes = sum(len(h) for h in historiques) * (64 + 3 * 24) / 1e6
+
+        tampon = TickRing(n, capacite)
+
+        def tampons():
+            for t, idx in enumerate(changements):
+                tampon.record(idx, float(t), prix[idx], volume[idx])
+        t_tampon, _ = chrono(tampons)
+        t_fenetre, vue = chrono(lambda: [tampon.last(j, 100) for j in range(min(n, 1000))], repetitions=3)
+        print(f"{n:>9,} {t_listes / ticks * 1e6:>17.1f} {t_tampon / ticks * 1e6:>17.1f} {memoire_listes:>12.1f} "
+              f"{tampon.nbytes / 1e6:>12.1f} {t_fenetre / min(n, 1000) * 1e6:>17.2f}")
+
+    # Les N derniers ticks sont une vue (aucune copie) et la mémoire ne dépend pas du nombre de ticks reçus
+    fenetre = tampon.last(0, 100)
+    assert np.shares_memory(fenetre['prix'], tampon.prix) and len(fenetre['prix']) == 100
+    avant = tampon.nbytes
+    tampon.record(np.arange(n), float(ticks), prix, volume)
+    assert tampon.nbytes == avant
+
+
+def bench_barres():
+    """Barres OHLCV 1 min / 5 min / 1 h: rééchantillonnage de tous les ticks contre agrégation incrémentale"""
+    rng = np.random.default_rng(DEFAULT_SEED)
+    ticks = 2_000
+    debut = pd.Timestamp('2025-06-02 09:00').timestamp()
+    print(f"{'symboles':>9} {'rééchantillonnage (ms)':>23} {'incrémental (µs/tick)':>22} {'barres 1 min':>13}")
+    for n in (10, 1_000, 10_000):
+        changements = [np.flatnonzero(rng.random(n) < 0.4) for _ in range(ticks)]
+        prix = rng.uniform(10, 100, (ticks, n))
+        volume = rng.uniform(0, 100, (ticks, n))
+        # Un tick toutes les 5 secondes, comme le ticker par défaut
+        horodatages = debut + 5 * np.arange(ticks)
+
+        # Avant: les barres sont recalculées depuis la table de tous les ticks de la séance
+        table = pd.DataFrame({'date': pd.to_datetime(np.repeat(horodatages, [len(i) for i in changements]), unit='s'),
+                              'symbole': np.concatenate(changements),
+                              'prix': np.concatenate([prix[t, i] for t, i in enumerate(changements)]),
+                              'volume': np.concatenate([volume[t, i] for t, i in enumerate(changements)])})
+
+        def reechantillonnage():
+            groupes = table.groupby(['symbole', pd.Grouper(key='date', freq='1min')])
+            return groupes['prix'].ohlc().join(groupes['volume'].sum())
+        t_avant, attendu = chrono(reechantillonnage)
+
+        # Après: chaque tick met à jour la barre en cours des trois périodes
+        barres = BarAggregator(range(n), debut)
+
+        def incremental():
+            for t, idx in enumerate(changements):
+                barres.record(idx, horodatages[t], prix[t, idx], volume[t, idx])
+        t_apres, _ = chrono(incremental)
+        minute = barres.frame('1min')
+        print(f"{n:>9,} {t_avant * 1e3:>23.1f} {t_apres / ticks * 1e6:>22.1f} {len(minute):>13,}")
+
+    # Mêmes barres que le rééchantillonnage (dates exprimées à l'heure locale)
+    minute = minute.sort_values(['symbole', 'date'], kind='stable')
+    assert len(minute) == len(attendu) and set(barres.builders) == set(PERIODES_BARRES)
+    assert np.allclose(minute['ouverture'], attendu['open']) and np.allclose(minute['cloture'], attendu['close'])
+    assert np.allclose(minute['volume'], attendu['volume'])
+
+
+BENCHMARKS = {
+    'historique': bench_historique,
+    'tick': bench_tick,
+    'sessions': bench_sessions,
+    'matrice': bench_matrice,
+    'demarrage': bench_demarrage,
+    'stockage': bench_stockage,
+    'echantillonnage': bench_echantillonnage,
+    'screener': bench_screener,
+    'risque': bench_risque,
+    'indice': bench_indice,
+    'parallele': bench_parallele,
+    'sources': bench_sources,
+    'streaming': bench_streaming,
+    'instantanes': bench_instantanes,
+    'intraday': bench_intraday,
+    'barres': bench_barres,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('noms', nargs='*', help=f"benchmarks à exécuter parmi: {', '.join(BENCHMARKS)}")
+    args = parser.parse_args()
+    inconnus = [nom for nom in args.noms if nom not in BENCHMARKS]
+    if inconnus:
+        parser.error(f"benchmark inconnu: {', '.join(inconnus)}")
+    for nom in args.noms or list(BENCHMARKS):
+        print(f"\n== {nom}: {BENCHMARKS[nom].__doc__}")
+        BENCHMARKS[nom]()
+
+
+if __name__ == "__main__":
+    main()
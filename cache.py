@@ -0,0 +1,126 @@
+# cache.py
+"""Cache partagé entre les sessions Streamlit du processus"""
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def estimate_size(valeur):
+    """Estime l'empreinte mémoire (octets) d'une valeur mise en cache"""
+    if isinstance(valeur, (pd.DataFrame, pd.Series)):
+        return int(valeur.memory_usage(deep=True).sum())
+    if isinstance(valeur, dict):
+        return sum(estimate_size(v) for v in valeur.values())
+    if isinstance(valeur, (list, tuple)):
+        return sum(estimate_size(v) for v in valeur)
+    nbytes = getattr(valeur, 'nbytes', None)
+    if nbytes is not None:
+        return int(nbytes)
+    return sys.getsizeof(valeur)
+
+
+def universe_fingerprint(entreprises):
+    """Empreinte stable de l'univers d'entreprises"""
+    contenu = repr(sorted((s, sorted(info.items())) for s, info in entreprises.items()))
+    return hashlib.sha1(contenu.encode('utf-8')).hexdigest()
+
+
+def frame_fingerprint(frame):
+    """Empreinte du contenu d'une table (valeurs et index): change dès qu'une cellule change"""
+    valeurs = pd.util.hash_pandas_object(frame, index=True).to_numpy()
+    return hashlib.sha1(valeurs.tobytes() + repr(list(frame.columns)).encode('utf-8')).hexdigest()
+
+
+def dataset_key(nom, entreprises, **parametres):
+    """Clé de cache d'un jeu de données: nom, univers et paramètres de génération"""
+    return (nom, universe_fingerprint(entreprises)) + tuple(sorted(parametres.items()))
+
+
+class TTLCache:
+    """Cache LRU thread-safe avec expiration (TTL) et éviction par taille"""
+
+    def __init__(self, ttl=6 * 3600, max_entries=32, max_bytes=512 * 1024 ** 2):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Retourne la valeur associée à la clé si elle est présente et valide"""
+        with self._lock:
+            entree = self._entries.get(key)
+            if entree is None or entree[0] < time.monotonic():
+                if entree is not None:
+                    self._remove(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entree[1]
+
+    def put(self, key, valeur):
+        """Stocke une valeur puis applique les limites de taille"""
+        taille = estimate_size(valeur)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, valeur, taille)
+            self._bytes += taille
+            self._evict()
+        return valeur
+
+    def get_or_create(self, key, factory):
+        """Retourne la valeur en cache ou la construit une seule fois pour tout le processus"""
+        manquant = object()
+        with self._lock:
+            valeur = self.get(key, manquant)
+            if valeur is manquant:
+                valeur = self.put(key, factory())
+            return valeur
+
+    def clear(self):
+        """Vide le cache (les compteurs sont conservés)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Compteurs d'utilisation du cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
+
+    def _remove(self, key):
+        _, _, taille = self._entries.pop(key)
+        self._bytes -= taille
+
+    def _evict(self):
+        maintenant = time.monotonic()
+        for key in [k for k, (expire, _, _) in self._entries.items() if expire < maintenant]:
+            self._remove(key)
+            self.evictions += 1
+        # Éviction LRU tant que les limites sont dépassées (on garde au moins l'entrée la plus récente)
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries
+                                          or (self.max_bytes and self._bytes > self.max_bytes)):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+
+# Instance unique par processus: le module n'est importé qu'une fois par le serveur Streamlit
+shared_cache = TTLCache()
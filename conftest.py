@@ -0,0 +1,2 @@
+# conftest.py
+"""Configuration pytest: la racine du dépôt est sur le chemin d'import des tests"""
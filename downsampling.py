@@ -0,0 +1,76 @@
+# downsampling.py
+"""Réduction côté serveur des séries temporelles avant leur envoi au navigateur"""
+import numpy as np
+import pandas as pd
+
+# Largeurs usuelles (px) des graphiques du dashboard en mise en page "wide"
+LARGEUR_DEMI_COLONNE = 700
+LARGEUR_PLEINE = 1400
+PIXELS_PAR_POINT = 2
+PIXELS_PAR_BOUGIE = 6
+
+
+def target_points(largeur=LARGEUR_DEMI_COLONNE, pixels_par_point=PIXELS_PAR_POINT):
+    """Nombre de points utiles pour une largeur de graphique donnée"""
+    return max(3, int(largeur // pixels_par_point))
+
+
+def lttb_indices(x, y, seuil):
+    """Positions retenues par Largest-Triangle-Three-Buckets (premier et dernier points conservés)"""
+    n = len(y)
+    if seuil >= n or seuil < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # seuil - 2 seaux intérieurs de taille quasi égale entre le premier et le dernier point
+    bornes = np.linspace(1, n - 1, seuil - 1).astype(np.intp)
+    indices = np.empty(seuil, dtype=np.intp)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for k in range(seuil - 2):
+        debut, fin = bornes[k], bornes[k + 1]
+        # Sommet C: moyenne du seau suivant (dernier point pour le dernier seau)
+        if k + 2 < len(bornes):
+            cx, cy = x[fin:bornes[k + 2]].mean(), y[fin:bornes[k + 2]].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        # Point du seau qui forme le plus grand triangle avec le point retenu précédent et C
+        aires = np.abs((x[a] - cx) * (y[debut:fin] - y[a]) - (x[a] - x[debut:fin]) * (cy - y[a]))
+        a = debut + int(np.argmax(aires))
+        indices[k + 1] = a
+    return indices
+
+
+def downsample_line(frame, x, y, seuil):
+    """Série (x, y) réduite à seuil points par LTTB, les lignes retenues sont celles d'origine"""
+    if len(frame) <= seuil:
+        return frame
+    abscisses = frame[x].to_numpy()
+    if np.issubdtype(abscisses.dtype, np.datetime64):
+        abscisses = abscisses.astype('datetime64[ns]').view('int64')
+    return frame.iloc[lttb_indices(abscisses, frame[y].to_numpy(), seuil)]
+
+
+def downsample_lines(frame, x, y, seuil, groupe):
+    """LTTB appliqué série par série (une ligne par valeur de groupe), ordre des x conservé"""
+    if frame.empty or frame.groupby(groupe, sort=False).size().max() <= seuil:
+        return frame
+    reduites = [downsample_line(serie, x, y, seuil) for _, serie in frame.groupby(groupe, sort=False)]
+    return pd.concat(reduites).sort_values(x, kind='stable')
+
+
+def ohlc_buckets(frame, seuil):
+    """Fusionne des bougies consécutives (ouverture, plus_haut, plus_bas, cloture, volume) en seuil bougies"""
+    n = len(frame)
+    if n <= seuil:
+        return frame
+    debuts = np.linspace(0, n, seuil, endpoint=False).astype(np.intp)
+    fins = np.append(debuts[1:], n) - 1
+    # Date et ouverture de la première bougie du seau, clôture de la dernière, extrêmes et volume cumulés
+    reduit = frame.iloc[debuts].copy()
+    reduit['plus_haut'] = np.maximum.reduceat(frame['plus_haut'].to_numpy(), debuts)
+    reduit['plus_bas'] = np.minimum.reduceat(frame['plus_bas'].to_numpy(), debuts)
+    reduit['cloture'] = frame['cloture'].to_numpy()[fins]
+    if 'volume' in frame:
+        reduit['volume'] = np.add.reduceat(frame['volume'].to_numpy(), debuts)
+    return reduit
@@ -0,0 +1,44 @@
+# figures.py
+"""Cache des figures Plotly partagé entre sessions, indexé par version des données, filtres et graphique"""
+import time
+
+from cache import TTLCache
+
+
+class CachedFigure:
+    """Figure construite, coût de construction et taille sérialisée (pour l'éviction par taille)"""
+
+    def __init__(self, figure, cout):
+        self.figure = figure
+        self.cout = cout
+        self.nbytes = len(figure.to_json())
+
+
+class FigureCache:
+    """Mémoïsation LRU des figures: une figure n'est reconstruite que si ses données ou filtres changent"""
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 ** 2):
+        self._cache = TTLCache(ttl=24 * 3600, max_entries=max_entries, max_bytes=max_bytes)
+
+    def get_or_build(self, graphique, version, filtres, builder):
+        """Retourne (figure, secondes de construction économisées), la figure partagée ne doit pas être modifiée"""
+        cle = (version, tuple(sorted(filtres.items())), graphique)
+        entree = self._cache.get(cle)
+        if entree is not None:
+            return entree.figure, entree.cout
+        debut = time.perf_counter()
+        figure = builder()
+        self._cache.put(cle, CachedFigure(figure, time.perf_counter() - debut))
+        return figure, 0.0
+
+    def clear(self):
+        """Vide le cache des figures"""
+        self._cache.clear()
+
+    def stats(self):
+        """Compteurs d'utilisation du cache des figures"""
+        return self._cache.stats()
+
+
+# Instance unique par processus, comme shared_cache
+figure_cache = FigureCache()
@@ -0,0 +1,218 @@
+# history.py
+"""Historique des prix partagé, étendu de façon incrémentale jour après jour"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from aggregates import MarketAggregates
+from index_engine import IndexEngine
+from parallel import SEUIL_PARALLELE, generate_price_matrices_parallel
+from risk import RiskAnalytics
+from simulation import CHAMPS_MATRICE, HISTORY_START, generate_price_matrices, matrices_to_frame
+
+
+def date_bounds(dates, debut=None, fin=None):
+    """Positions [i, j) des dates triées comprises entre debut et fin inclus (recherche dichotomique)"""
+    valeurs = np.asarray(dates, dtype='datetime64[ns]')
+    i = 0 if debut is None else int(np.searchsorted(valeurs, np.datetime64(pd.Timestamp(debut)), 'left'))
+    j = len(valeurs) if fin is None else int(np.searchsorted(valeurs, np.datetime64(pd.Timestamp(fin)), 'right'))
+    return i, max(i, j)
+
+
+def slice_dates(frame, debut=None, fin=None, colonne='date'):
+    """Tranche d'une table triée par date, sans masque booléen sur toute la table"""
+    i, j = date_bounds(frame[colonne], debut, fin)
+    return frame.iloc[i:j]
+
+
+class PriceMatrix:
+    """Représentation large (jours × symboles) des prix, volumes et capitalisations, extensible par blocs"""
+
+    def __init__(self, symboles, capacite=0):
+        self.symboles = list(symboles)
+        self.positions = {symbole: j for j, symbole in enumerate(self.symboles)}
+        self.dates = pd.DatetimeIndex([])
+        self._buffers = {champ: np.empty((capacite, len(self.symboles))) for champ in CHAMPS_MATRICE}
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def prix(self):
+        """Matrice des prix (vue sur les jours matérialisés)"""
+        return self._buffers['prix'][:self._n]
+
+    @property
+    def volume(self):
+        """Matrice des volumes (vue sur les jours matérialisés)"""
+        return self._buffers['volume'][:self._n]
+
+    @property
+    def market_cap(self):
+        """Matrice des capitalisations (vue sur les jours matérialisés)"""
+        return self._buffers['market_cap'][:self._n]
+
+    def append(self, matrices):
+        """Ajoute un bloc de jours, la capacité double si nécessaire (coût amorti constant par jour)"""
+        fin = self._n + len(matrices['dates'])
+        if self._n == 0:
+            # Premier bloc adopté tel quel: aucune copie, y compris pour des tableaux mappés en mémoire
+            self._buffers = {champ: matrices[champ] for champ in CHAMPS_MATRICE}
+        else:
+            if fin > len(self._buffers['prix']):
+                capacite = max(fin, 2 * len(self._buffers['prix']))
+                for champ, buffer in self._buffers.items():
+                    agrandi = np.empty((capacite, len(self.symboles)))
+                    agrandi[:self._n] = buffer[:self._n]
+                    self._buffers[champ] = agrandi
+            for champ in CHAMPS_MATRICE:
+                self._buffers[champ][self._n:fin] = matrices[champ]
+        self.dates = self.dates.append(pd.DatetimeIndex(matrices['dates']))
+        self._n = fin
+
+    def block(self):
+        """Matrices complètes au format de generate_price_matrices"""
+        return {'dates': self.dates, 'symboles': self.symboles, 'prix': self.prix,
+                'volume': self.volume, 'market_cap': self.market_cap}
+
+
+class PriceHistory:
+    """Historique quotidien des prix et agrégats matérialisés, complétés uniquement pour les jours manquants"""
+
+    def __init__(self, entreprises, seed, start=HISTORY_START, workers=None):
+        self.entreprises = entreprises
+        self.seed = seed
+        self.start = pd.Timestamp(start)
+        # Nombre de processus pour générer les gros blocs (None: génération séquentielle)
+        self.workers = workers
+        # Représentation large tenue en parallèle de la table longue
+        self.matrix = PriceMatrix(entreprises)
+        # Le flux aléatoire continue d'un ajout à l'autre
+        self.rng = np.random.default_rng(seed)
+        self.aggregates = MarketAggregates(entreprises)
+        # Indice MVM pondéré et sous-indices sectoriels
+        self.index = IndexEngine(entreprises)
+        self._lock = threading.RLock()
+        # Rendements et métriques de risque glissantes, complétés avec les mêmes blocs de jours
+        # (leurs lectures prennent le verrou de l'historique)
+        self.risk = RiskAnalytics(entreprises, self._lock)
+        # Dernière ligne connue par symbole, pour amorcer le carnet live en temps constant
+        self.latest = {}
+        # Table longue construite à la première lecture (un rechargement depuis le disque ne la paie pas)
+        self._frame = None
+
+    @property
+    def frame(self):
+        """Table longue (date, symbole) de l'historique"""
+        if self._frame is None:
+            with self._lock:
+                if self._frame is None:
+                    self._frame = self._to_frame(self.matrix.block())
+        return self._frame
+
+    @property
+    def dates(self):
+        """Jours de bourse matérialisés, partagés par tous les symboles"""
+        return self.matrix.dates
+
+    def prices(self):
+        """Jours et matrice des prix relevés ensemble: une clôture concurrente ne les désaligne pas"""
+        with self._lock:
+            return self.matrix.dates, self.matrix.prix
+
+    @property
+    def last_date(self):
+        """Dernier jour déjà matérialisé (None si l'historique est vide)"""
+        return self.dates[-1] if len(self.dates) else None
+
+    def missing_dates(self, until):
+        """Jours à générer pour couvrir l'historique jusqu'à until"""
+        debut = self.start if self.last_date is None else self.last_date + pd.Timedelta(days=1)
+        return pd.date_range(debut, pd.Timestamp(until).normalize(), freq='D')
+
+    def extend(self, until):
+        """Génère et ajoute les jours manquants jusqu'à until, retourne le nombre de jours ajoutés"""
+        with self._lock:
+            dates = self.missing_dates(until)
+            if len(dates) == 0:
+                return 0
+            if self.workers and len(dates) * len(self.entreprises) >= SEUIL_PARALLELE:
+                # Graine des shards tirée du flux principal: la reprise après rechargement reste reproductible
+                graine = int(self.rng.integers(2 ** 63))
+                matrices = generate_price_matrices_parallel(self.entreprises, dates, graine, self.workers)
+            else:
+                matrices = generate_price_matrices(self.entreprises, dates, self.rng)
+            self._append(matrices)
+            return len(dates)
+
+    def load(self, matrices, rng_state=None):
+        """Charge un bloc sans simulation (persisté ou lu d'une source), reprend le flux aléatoire s'il est fourni"""
+        with self._lock:
+            self._append(matrices)
+            if rng_state is not None:
+                self.rng.bit_generator.state = rng_state
+
+    def close_session(self, seance):
+        """Verse la ligne quotidienne d'une séance live close sans recalcul, retourne si elle est ajoutée"""
+        with self._lock:
+            # Jour déjà présent (simulé ou chargé): l'historique reste tel quel
+            if self.last_date is not None and seance['date'] <= self.last_date:
+                return False
+            cloture = seance['cloture']
+            # Capitalisation suivant le cours depuis la dernière clôture connue
+            market_cap = self.matrix.market_cap[-1] * cloture / self.matrix.prix[-1]
+            self._append({'dates': pd.DatetimeIndex([seance['date']]), 'symboles': self.matrix.symboles,
+                          'prix': cloture[None], 'volume': seance['volume'][None], 'market_cap': market_cap[None]})
+            return True
+
+    def latest_row(self, symbole):
+        """Dernière ligne (date, prix, volume, capitalisation) d'un symbole"""
+        return self.latest[symbole]
+
+    def _append(self, matrices):
+        premier_jour = len(self.matrix)
+        self.matrix.append(matrices)
+
+        # Agrégats, indice, risques et dernières lignes calculés sur les seuls nouveaux jours
+        self.aggregates.update(matrices)
+        self.index.update(matrices)
+        self.risk.update(matrices, self.index.levels['indice'].to_numpy()[premier_jour:])
+        self.latest = self._latest_rows(matrices)
+
+        ancien = self._frame
+        if ancien is None:
+            return
+        nouveau = self._to_frame(matrices)
+        # La référence est remplacée d'un bloc: les lecteurs gardent un état cohérent
+        self._frame = pd.concat([ancien, nouveau], ignore_index=True)
+
+    def _latest_rows(self, matrices):
+        date = matrices['dates'][-1]
+        return {
+            symbole: {'date': date, 'prix': prix, 'volume': volume, 'market_cap': market_cap}
+            for symbole, prix, volume, market_cap in zip(matrices['symboles'], matrices['prix'][-1].tolist(),
+                                                         matrices['volume'][-1].tolist(),
+                                                         matrices['market_cap'][-1].tolist())
+        }
+
+    def _to_frame(self, matrices):
+        return matrices_to_frame(matrices, self.entreprises)
+
+
+_histories = {}
+_histories_lock = threading.Lock()
+
+
+def shared_history(key, factory):
+    """Retourne l'historique du processus associé à la clé, en le créant au premier appel
+
+    Comme le carnet live qu'il suit, il n'expire jamais: toutes les sessions, anciennes ou nouvelles,
+    lisent le même indice live et les mêmes clôtures de séance.
+    """
+    with _histories_lock:
+        history = _histories.get(key)
+        if history is None:
+            history = _histories[key] = factory()
+        return history
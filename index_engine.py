@@ -0,0 +1,132 @@
+# index_engine.py
+"""Indice MVM pondéré par poids_indice: diviseur maintenu, sous-indices sectoriels et niveau live incrémental"""
+import numpy as np
+import pandas as pd
+
+from aggregates import sector_membership
+
+BASE_INDICE = 1000.0
+# Recalcul exact périodique du niveau live pour borner la dérive des sommes incrémentales
+RECALCUL_LIVE = 1000
+# Au-delà de cette part de symboles modifiés, resommer tout le carnet coûte moins que les écarts indexés
+# (croisement mesuré par benchmark.py indice vers 15-20% de 10k à 100k symboles: le ticker simulé,
+# qui modifie 40% du carnet, resomme; les flux réels, peu de symboles par image, suivent les écarts)
+PART_INCREMENTALE = 0.15
+
+
+class IndexEngine:
+    """Indice Σ poids × prix / diviseur et sous-indices sectoriels, historiques (par blocs) et live (par tick)"""
+
+    def __init__(self, entreprises, base=BASE_INDICE):
+        self.symboles = list(entreprises)
+        self.poids = np.array([entreprises[s]['poids_indice'] for s in self.symboles], dtype=float)
+        self.secteurs, self._membership = sector_membership(entreprises)
+        self.codes = self._membership.argmax(axis=1)
+        self.base = base
+        # Diviseurs fixés au premier jour (niveau = base), ajustés ensuite à chaque changement de pondération
+        self.diviseur = None
+        self.diviseurs_secteurs = None
+        self.levels = pd.DataFrame({'date': pd.DatetimeIndex([]), 'indice': np.array([], dtype=float)})
+        self.sector_levels = pd.DataFrame(columns=['date', 'secteur', 'indice'])
+        self._dernier_prix = None
+        # Carnet live suivi: prix vus, sommes pondérées totale et par secteur
+        self._engine = None
+        self._prix_live = None
+        self._somme_live = None
+        self._sommes_secteurs_live = None
+        self._ticks = 0
+
+    @property
+    def last_close(self):
+        """Dernier niveau historique de l'indice (None si l'historique est vide)"""
+        return float(self.levels['indice'].iloc[-1]) if len(self.levels) else None
+
+    def update(self, matrices):
+        """Complète les niveaux historiques pour un bloc de jours, en une passe vectorielle"""
+        prix = matrices['prix']
+        ponderes = prix * self.poids
+        sommes = ponderes.sum(axis=1)
+        sommes_secteurs = ponderes @ self._membership
+        if self.diviseur is None:
+            self.diviseur = sommes[0] / self.base
+            self.diviseurs_secteurs = sommes_secteurs[0] / self.base
+        self._dernier_prix = prix[-1]
+
+        niveaux = pd.DataFrame({'date': matrices['dates'], 'indice': sommes / self.diviseur})
+        secteurs = (pd.DataFrame(sommes_secteurs / self.diviseurs_secteurs, index=matrices['dates'],
+                                 columns=self.secteurs)
+                    .rename_axis(index='date', columns='secteur').stack().rename('indice').reset_index())
+        if len(self.levels):
+            niveaux = pd.concat([self.levels, niveaux], ignore_index=True)
+            secteurs = pd.concat([self.sector_levels, secteurs], ignore_index=True)
+        self.levels, self.sector_levels = niveaux, secteurs
+
+    def rebalance(self, poids):
+        """Change les pondérations sans saut de niveau: diviseurs ajustés au dernier prix de clôture"""
+        poids = np.asarray(poids, dtype=float)
+        prix = self._dernier_prix
+        self.diviseur *= (prix @ poids) / (prix @ self.poids)
+        self.diviseurs_secteurs = self.diviseurs_secteurs * (((prix * poids) @ self._membership)
+                                                             / ((prix * self.poids) @ self._membership))
+        self.poids = poids
+        if self._engine is not None:
+            with self._engine.lock:
+                self._recompute_live()
+
+    def subset_levels(self, prix, positions, reference):
+        """Indice pondéré restreint à quelques symboles, base au niveau de référence (prix du premier jour)"""
+        poids = self.poids[positions]
+        return prix[:, positions] @ poids / (reference[positions] @ poids / self.base)
+
+    def attach(self, engine):
+        """Amorce le niveau live sur le carnet d'un TickEngine puis le suit tick par tick (remplace l'indice abonné)"""
+        if self._engine is engine:
+            return
+        with engine.lock:
+            self._engine = engine
+            self._prix_live = engine.prix.copy()
+            self._recompute_live()
+            engine.listeners['indice'] = self.on_tick
+
+    def detach(self):
+        """Cesse de suivre le carnet (le dernier niveau live reste lisible)"""
+        if self._engine is not None:
+            with self._engine.lock:
+                if self._engine.listeners.get('indice') == self.on_tick:
+                    del self._engine.listeners['indice']
+            self._engine = None
+
+    def on_tick(self, idx, prix):
+        """Applique un tick en O(symboles modifiés): seuls les écarts de prix pondérés sont ajoutés"""
+        if len(idx) > PART_INCREMENTALE * len(prix):
+            self._prix_live[:] = prix
+            self._recompute_live()
+            return
+        self._apply_deltas(idx, prix)
+
+    def _apply_deltas(self, idx, prix):
+        nouveau = prix[idx]
+        delta = self.poids[idx] * (nouveau - self._prix_live[idx])
+        self._prix_live[idx] = nouveau
+        self._somme_live += delta.sum()
+        self._sommes_secteurs_live += np.bincount(self.codes[idx], weights=delta,
+                                                  minlength=len(self.secteurs))
+        self._ticks += 1
+        if self._ticks >= RECALCUL_LIVE:
+            self._recompute_live()
+
+    def live_level(self):
+        """Niveau live de l'indice (None avant rattachement au carnet)"""
+        if self._somme_live is None:
+            return None
+        return self._somme_live / self.diviseur
+
+    def live_sector_levels(self):
+        """Niveaux live des sous-indices sectoriels"""
+        return pd.Series(self._sommes_secteurs_live / self.diviseurs_secteurs, index=self.secteurs)
+
+    def _recompute_live(self):
+        ponderes = self._prix_live * self.poids
+        self._somme_live = ponderes.sum()
+        self._sommes_secteurs_live = np.bincount(self.codes, weights=ponderes, minlength=len(self.secteurs))
+        self._ticks = 0
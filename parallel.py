@@ -0,0 +1,63 @@
+# parallel.py
+"""Génération parallèle des matrices de prix: univers découpé en shards de symboles, un processus par shard"""
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from simulation import CHAMPS_MATRICE, generate_price_matrices
+
+# Taille fixe des shards: le résultat ne dépend pas du nombre de processus
+TAILLE_SHARD = 512
+# En dessous de ce nombre de cellules (jours × symboles), le démarrage du pool coûte plus qu'il ne rapporte
+SEUIL_PARALLELE = 2_000_000
+# Fichiers mappés créés en RAM (tmpfs) quand le système en dispose: c'est alors de la mémoire partagée
+MEMOIRE_PARTAGEE = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def matrix_dir(octets):
+    """Répertoire des fichiers mappés: /dev/shm s'il peut les contenir, sinon le répertoire temporaire du système"""
+    # /dev/shm est souvent limité (64 Mo dans un conteneur Docker): un dépassement y lève SIGBUS, pas une erreur
+    if MEMOIRE_PARTAGEE is not None and shutil.disk_usage(MEMOIRE_PARTAGEE).free >= octets:
+        return MEMOIRE_PARTAGEE
+    return None
+
+
+def shard_bounds(n, taille=TAILLE_SHARD):
+    """Bornes [debut, fin) des shards de colonnes pour un univers de n symboles"""
+    return [(debut, min(debut + taille, n)) for debut in range(0, n, taille)]
+
+
+def generate_price_matrices_parallel(entreprises, dates, seed, workers=None, taille=TAILLE_SHARD):
+    """Matrices au format de generate_price_matrices, chaque shard tiré de son propre flux SeedSequence"""
+    dates = pd.DatetimeIndex(dates)
+    symboles = list(entreprises)
+    shards = shard_bounds(len(symboles), taille)
+    graines = np.random.SeedSequence(seed).spawn(len(shards))
+    octets = len(CHAMPS_MATRICE) * len(dates) * len(symboles) * np.dtype(float).itemsize
+    repertoire = Path(tempfile.mkdtemp(prefix='matrices-', dir=matrix_dir(octets)))
+    try:
+        for champ in CHAMPS_MATRICE:
+            np.lib.format.open_memmap(repertoire / f'{champ}.npy', mode='w+', shape=(len(dates), len(symboles)))
+        taches = [(repertoire, debut, fin, {s: entreprises[s] for s in symboles[debut:fin]}, dates, graine)
+                  for (debut, fin), graine in zip(shards, graines)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_generate_shard, *zip(*taches)))
+        # Le parent mappe les fichiers remplis par les processus: aucune copie ni assemblage
+        matrices = {champ: np.load(repertoire / f'{champ}.npy', mmap_mode='r+') for champ in CHAMPS_MATRICE}
+    finally:
+        # Les mappages ouverts survivent à la suppression: la mémoire est rendue avec le dernier tableau
+        shutil.rmtree(repertoire, ignore_errors=True)
+    return dict(matrices, dates=dates, symboles=symboles)
+
+
+def _generate_shard(repertoire, debut, fin, entreprises, dates, graine):
+    matrices = generate_price_matrices(entreprises, dates, np.random.default_rng(graine))
+    for champ in CHAMPS_MATRICE:
+        cible = np.load(repertoire / f'{champ}.npy', mmap_mode='r+')
+        cible[:, debut:fin] = matrices[champ]
+        cible.flush()
@@ -0,0 +1,217 @@
+# risk.py
+"""Analyses de risque glissantes (rendements, volatilité, drawdowns, bêta, corrélations) tenues à jour par jour"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from aggregates import sector_membership
+
+JOURS_BOURSE = 252
+FENETRE_RISQUE = 63
+
+
+def drawdown_series(prix):
+    """Drawdown (%) de chaque jour par rapport au plus haut atteint jusque-là"""
+    return (prix / np.maximum.accumulate(prix, axis=0) - 1) * 100
+
+
+class GrowingArray:
+    """Tableau extensible par blocs de lignes, capacité doublée si nécessaire (coût amorti constant)"""
+
+    def __init__(self, largeur=None):
+        self._forme = () if largeur is None else (largeur,)
+        self._buffer = np.empty((0,) + self._forme)
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def values(self):
+        """Lignes matérialisées (vue, sans copie)"""
+        return self._buffer[:self._n]
+
+    def append(self, bloc):
+        """Ajoute un bloc de lignes"""
+        fin = self._n + len(bloc)
+        if fin > len(self._buffer):
+            agrandi = np.empty((max(fin, 2 * len(self._buffer)),) + self._forme)
+            agrandi[:self._n] = self._buffer[:self._n]
+            self._buffer = agrandi
+        self._buffer[self._n:fin] = bloc
+        self._n = fin
+
+
+class CumulativeSums:
+    """Sommes cumulées avec une ligne zéro en tête: la somme sur une fenêtre est une différence de deux lignes"""
+
+    def __init__(self, largeur=None):
+        self._cumul = GrowingArray(largeur)
+        self._cumul.append(np.zeros((1,) if largeur is None else (1, largeur)))
+
+    @property
+    def values(self):
+        """Sommes cumulées (n + 1 lignes)"""
+        return self._cumul.values
+
+    def append(self, bloc):
+        """Prolonge les sommes cumulées avec un bloc de nouvelles lignes"""
+        self._cumul.append(self._cumul.values[-1] + np.cumsum(bloc, axis=0))
+
+    def window(self, fenetre):
+        """Somme des fenetre dernières lignes"""
+        cumul = self._cumul.values
+        return cumul[-1] - cumul[-1 - fenetre]
+
+
+class RiskAnalytics:
+    """Rendements logarithmiques et métriques de risque par symbole, mises à jour sur les seuls nouveaux jours"""
+
+    def __init__(self, entreprises, lock=None):
+        self.symboles = list(entreprises)
+        # Verrou de l'historique propriétaire: une lecture ne voit jamais un bloc à moitié intégré
+        self._lock = lock if lock is not None else threading.RLock()
+        self.secteurs, self._membership = sector_membership(entreprises)
+        self._sector_size = self._membership.sum(axis=0)
+        n = len(self.symboles)
+        # Dates des rendements (à partir du deuxième jour d'historique)
+        self.dates = pd.DatetimeIndex([])
+        self.returns = GrowingArray(n)
+        self.sector_returns = GrowingArray(len(self.secteurs))
+        # Sommes cumulées des rendements décalés (d = r - premier rendement), de leurs carrés et des produits
+        # avec le rendement décalé de l'indice: variance et covariance ne dépendent pas du décalage, mais
+        # E[d²] - E[d]² ne perd plus de chiffres significatifs quand la moyenne domine l'écart-type
+        self._decalage = None
+        self._decalage_m = None
+        self._r = CumulativeSums(n)
+        self._r2 = CumulativeSums(n)
+        self._rm = CumulativeSums(n)
+        self._m = CumulativeSums()
+        self._m2 = CumulativeSums()
+        self._dernier_prix = None
+        self._dernier_indice = None
+        # Plus haut atteint, drawdown courant et pire drawdown (%) par symbole
+        self.peak = None
+        self.drawdown = None
+        self.max_drawdown = None
+
+    def update(self, matrices, indice):
+        """Intègre un bloc de nouveaux jours (matrices jours × symboles et niveaux de l'indice de référence)"""
+        with self._lock:
+            self._update(matrices, indice)
+
+    def _update(self, matrices, indice):
+        prix = matrices['prix']
+        self._update_drawdowns(prix)
+
+        dates = matrices['dates']
+        if self._dernier_prix is not None:
+            # Le premier rendement du bloc relie le dernier jour déjà intégré
+            prix = np.vstack([self._dernier_prix, prix])
+            indice = np.concatenate([[self._dernier_indice], indice])
+        else:
+            dates = dates[1:]
+        self._dernier_prix, self._dernier_indice = prix[-1], indice[-1]
+        if len(dates) == 0:
+            return
+
+        rendements = np.diff(np.log(prix), axis=0)
+        marche = np.diff(np.log(indice))
+        self.dates = self.dates.append(pd.DatetimeIndex(dates))
+        self.returns.append(rendements)
+        self.sector_returns.append(rendements @ self._membership / self._sector_size)
+        if self._decalage is None:
+            self._decalage, self._decalage_m = rendements[0].copy(), marche[0]
+        ecarts = rendements - self._decalage
+        ecarts_m = marche - self._decalage_m
+        self._r.append(ecarts)
+        self._r2.append(ecarts ** 2)
+        self._rm.append(ecarts * ecarts_m[:, None])
+        self._m.append(ecarts_m)
+        self._m2.append(ecarts_m ** 2)
+
+    def volatility(self, fenetre=JOURS_BOURSE, annualiser=False):
+        """Volatilité réalisée (%) par symbole sur les fenetre derniers rendements"""
+        with self._lock:
+            w = self._effective(fenetre)
+            if w < 2:
+                return np.full(len(self.symboles), np.nan)
+            variance = (self._r2.window(w) - self._r.window(w) ** 2 / w) / (w - 1)
+        return self._scale(np.sqrt(np.maximum(variance, 0)), annualiser)
+
+    def rolling_volatility(self, positions, fenetre=FENETRE_RISQUE, annualiser=False):
+        """Volatilité glissante (%) des symboles aux positions données, une ligne par fin de fenêtre"""
+        with self._lock:
+            w = self._effective(fenetre)
+            if w < 2:
+                return pd.DataFrame(columns=[self.symboles[j] for j in positions])
+            somme = self._r.values[:, positions]
+            carres = self._r2.values[:, positions]
+            dates = self.dates
+        s1 = somme[w:] - somme[:-w]
+        variance = ((carres[w:] - carres[:-w]) - s1 ** 2 / w) / (w - 1)
+        return pd.DataFrame(self._scale(np.sqrt(np.maximum(variance, 0)), annualiser),
+                            index=dates[w - 1:], columns=[self.symboles[j] for j in positions])
+
+    def beta(self, fenetre=JOURS_BOURSE):
+        """Bêta de chaque symbole par rapport à l'indice sur les fenetre derniers rendements"""
+        with self._lock:
+            w = self._effective(fenetre)
+            if w < 2:
+                return np.full(len(self.symboles), np.nan)
+            somme_m = self._m.window(w)
+            covariance = self._rm.window(w) - self._r.window(w) * somme_m / w
+            variance = self._m2.window(w) - somme_m ** 2 / w
+        return covariance / variance if variance > 0 else np.full(len(self.symboles), np.nan)
+
+    def period_return(self, fenetre=JOURS_BOURSE):
+        """Rendement (%) de chaque symbole sur les fenetre derniers jours"""
+        with self._lock:
+            w = self._effective(fenetre)
+            if w == 0:
+                return np.zeros(len(self.symboles))
+            # Somme des rendements décalés, plus le décalage de chacun des w jours
+            return (np.exp(self._r.window(w) + w * self._decalage) - 1) * 100
+
+    def sector_correlation(self, fenetre=JOURS_BOURSE):
+        """Matrice de corrélation des rendements sectoriels sur les fenetre derniers jours"""
+        with self._lock:
+            w = self._effective(fenetre)
+            rendements = self.sector_returns.values[len(self.sector_returns) - w:]
+        return pd.DataFrame(np.corrcoef(rendements, rowvar=False) if w >= 2 else np.nan,
+                            index=self.secteurs, columns=self.secteurs)
+
+    def summary(self, fenetre=JOURS_BOURSE):
+        """Tableau des métriques de risque par symbole"""
+        # Verrou réentrant: toutes les colonnes décrivent le même état de l'historique
+        with self._lock:
+            return self._summary(fenetre)
+
+    def _summary(self, fenetre):
+        return pd.DataFrame({
+            'symbole': self.symboles,
+            'rendement': self.period_return(fenetre),
+            'volatilite': self.volatility(fenetre),
+            'volatilite_annualisee': self.volatility(fenetre, annualiser=True),
+            'beta': self.beta(fenetre),
+            'drawdown': self.drawdown,
+            'drawdown_max': self.max_drawdown
+        })
+
+    def _update_drawdowns(self, prix):
+        pics = np.maximum.accumulate(prix, axis=0)
+        if self.peak is not None:
+            pics = np.maximum(pics, self.peak)
+        drawdowns = (prix / pics - 1) * 100
+        pire = drawdowns.min(axis=0)
+        self.peak = pics[-1]
+        self.drawdown = drawdowns[-1]
+        self.max_drawdown = pire if self.max_drawdown is None else np.minimum(self.max_drawdown, pire)
+
+    def _effective(self, fenetre):
+        return min(fenetre, len(self.dates))
+
+    def _scale(self, volatilite, annualiser):
+        volatilite = volatilite * 100
+        return volatilite * np.sqrt(JOURS_BOURSE) if annualiser else volatilite
@@ -0,0 +1,83 @@
+# scheduler.py
+"""Ticker d'arrière-plan partagé par toutes les sessions du processus"""
+import threading
+import time
+
+TICK_INTERVAL = 5
+
+
+class RefreshScheduler:
+    """Fait avancer un carnet de cotations partagé à cadence fixe dans un thread démon"""
+
+    def __init__(self, engine, interval=TICK_INTERVAL, source=None):
+        self.engine = engine
+        self.interval = interval
+        # Source de cotations réelles interrogée à chaque tick (None: carnet simulé)
+        self.source = source
+        self._symboles = engine.static['symbole'].tolist()
+        self.last_tick = time.time()
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def version(self):
+        return self.engine.version
+
+    def start(self):
+        """Démarre le thread du ticker (idempotent)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='madagascar-ticker', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Arrête le ticker"""
+        self._stop.set()
+
+    def snapshot(self):
+        """Carnet courant (DataFrame reconstruit au plus une fois par tick, en lecture seule)"""
+        return self.engine.frame()
+
+    def tick_now(self):
+        """Force un tick immédiat (bouton de rafraîchissement manuel)"""
+        try:
+            if self.source is None:
+                self.engine.tick()
+            else:
+                # Interrogation hors verrou: les lecteurs du carnet n'attendent pas le réseau
+                cotations = self.source.quotes(self._symboles)
+                self.engine.apply_quotes(cotations['prix'], cotations['volume'])
+                self.last_error = None
+        except Exception as erreur:
+            # Flux indisponible après les reprises, réponse mal formée...: le carnet garde les dernières
+            # cotations, l'incident est signalé dans la sidebar sans atteindre le script ni le thread du ticker
+            self.last_error = erreur
+            return
+        self.last_tick = time.time()
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Cadence fixe commune à toutes les sessions (le volume simulé d'une séance en dépend):
+            # l'attente n'est interrompue que par stop
+            if self._stop.wait(self.interval):
+                break
+            self.tick_now()
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def shared_scheduler(key, engine_factory, interval=TICK_INTERVAL, source=None):
+    """Retourne le ticker du processus associé à la clé, en le créant au premier appel"""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = RefreshScheduler(engine_factory(), interval, source)
+            if source is not None:
+                # Premier relevé immédiat: le carnet démarre sur les cotations de la source
+                scheduler.tick_now()
+            _schedulers[key] = scheduler
+        return scheduler.start()
@@ -0,0 +1,94 @@
+# screener.py
+"""Screener indexé sur le carnet live: index triés par champ et écrans sauvegardés réévalués par tick"""
+import numpy as np
+
+# Champs du carnet live, relus à chaque évaluation (les autres sont indexés une fois pour toutes)
+CHAMPS_LIVE = ('variation_pct', 'prix', 'volume')
+
+
+class FieldIndex:
+    """Index trié d'un champ: un intervalle de valeurs devient une tranche de positions"""
+
+    def __init__(self, valeurs):
+        self.valeurs = np.asarray(valeurs, dtype=float)
+        self.ordre = np.argsort(self.valeurs, kind='stable')
+        self.tries = self.valeurs[self.ordre]
+
+    def range(self, minimum=None, maximum=None):
+        """Positions des valeurs comprises dans [minimum, maximum] (vue sur l'ordre de tri, sans copie)"""
+        i = 0 if minimum is None else int(np.searchsorted(self.tries, minimum, 'left'))
+        j = len(self.tries) if maximum is None else int(np.searchsorted(self.tries, maximum, 'right'))
+        return self.ordre[i:max(i, j)]
+
+
+class Screener:
+    """Évalue des critères {champ: (min, max)} sur le carnet d'un TickEngine"""
+
+    def __init__(self, engine, volatilite):
+        self.engine = engine
+        self.secteurs = engine.static['secteur'].to_numpy()
+        self.indexes = {
+            'market_cap': FieldIndex(engine.static['market_cap']),
+            'dividende_yield': FieldIndex(engine.static['dividende_yield']),
+            'volatilite': FieldIndex(volatilite)
+        }
+
+    def screen(self, criteres, secteurs=None):
+        """Positions (triées) des symboles qui satisfont tous les critères"""
+        with self.engine.lock:
+            return self._evaluate(criteres, secteurs)
+
+    def values(self, champ):
+        """Valeurs courantes d'un champ pour tout le carnet"""
+        if champ in self.indexes:
+            return self.indexes[champ].valeurs
+        return getattr(self.engine, champ)
+
+    def _evaluate(self, criteres, secteurs=None, positions=None):
+        criteres = {champ: bornes for champ, bornes in criteres.items() if bornes != (None, None)}
+        if positions is None:
+            # Le critère indexé le plus sélectif fournit les candidats, les autres sont testés sur eux seuls
+            plages = [self.indexes[champ].range(*bornes) for champ, bornes in criteres.items()
+                      if champ in self.indexes]
+            positions = min(plages, key=len) if plages else np.arange(len(self.engine))
+        garde = np.ones(len(positions), dtype=bool)
+        for champ, (minimum, maximum) in criteres.items():
+            valeurs = self.values(champ)[positions]
+            if minimum is not None:
+                garde &= valeurs >= minimum
+            if maximum is not None:
+                garde &= valeurs <= maximum
+        if secteurs:
+            garde &= np.isin(self.secteurs[positions], list(secteurs))
+        return np.sort(positions[garde])
+
+
+class SavedScreen:
+    """Écran sauvegardé: l'ensemble résultat n'est réévalué que sur les symboles modifiés depuis le dernier tick vu"""
+
+    def __init__(self, screener, criteres, secteurs=None):
+        self.screener = screener
+        self.criteres = dict(criteres)
+        self.secteurs = tuple(secteurs or ())
+        statiques = {champ: bornes for champ, bornes in self.criteres.items() if champ not in CHAMPS_LIVE}
+        self.live = {champ: bornes for champ, bornes in self.criteres.items() if champ in CHAMPS_LIVE}
+        # Critères statiques évalués une seule fois: seuls les candidats restants suivent les ticks
+        self.candidats = np.zeros(len(screener.engine), dtype=bool)
+        self.candidats[screener._evaluate(statiques, self.secteurs)] = True
+        self.membres = np.zeros(len(screener.engine), dtype=bool)
+        self.version = None
+
+    def refresh(self):
+        """Met à jour l'écran au tick courant et retourne les positions retenues"""
+        engine = self.screener.engine
+        with engine.lock:
+            positions = None
+            if self.version is None:
+                positions = np.flatnonzero(self.candidats)
+            elif self.live and engine.version != self.version:
+                positions = np.flatnonzero(self.candidats & (engine.symbol_version > self.version))
+            if positions is not None:
+                self.membres[positions] = False
+                self.membres[self.screener._evaluate(self.live, positions=positions)] = True
+            self.version = engine.version
+        return np.flatnonzero(self.membres)
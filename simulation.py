@@ -0,0 +1,102 @@
+# simulation.py
+"""Génération vectorisée des données de marché simulées pour Madagascar"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_SEED = 20200101
+HISTORY_START = '2020-01-01'
+CHAMPS_MATRICE = ('prix', 'volume', 'market_cap')
+
+SECTEURS_SYNTHETIQUES = ['Transport', 'Télécommunications', 'Immobilier', 'Consommation',
+                         'Tourisme', 'Finance', 'Mines', 'Industrie', 'Agriculture']
+
+
+def covid_bounds(dates):
+    """Bornes (min, max) du facteur d'impact COVID pour chaque date"""
+    dates = pd.DatetimeIndex(dates)
+    low = np.full(len(dates), 1.0)
+    high = np.full(len(dates), 1.4)
+
+    annee_2020 = dates.year == 2020
+    premier_semestre = annee_2020 & (dates.month <= 6)
+    second_semestre = annee_2020 & (dates.month > 6)
+    annee_2021 = dates.year == 2021
+
+    low[premier_semestre], high[premier_semestre] = 0.3, 0.6
+    low[second_semestre], high[second_semestre] = 0.6, 0.9
+    low[annee_2021], high[annee_2021] = 0.9, 1.2
+    return low, high
+
+
+def generate_price_matrices(entreprises, dates, rng):
+    """Génère en une passe les matrices (dates × symboles) de prix, volumes et capitalisations"""
+    dates = pd.DatetimeIndex(dates)
+    symboles = list(entreprises)
+    market_cap = np.array([entreprises[s]['market_cap'] for s in symboles], dtype=float)
+    volume_moyen = np.array([entreprises[s]['volume_moyen'] for s in symboles], dtype=float)
+    shape = (len(dates), len(symboles))
+
+    # Prix de base réaliste selon la capitalisation
+    prix = rng.uniform(0.1, 0.3, shape)
+    prix *= market_cap / 1e6
+
+    # Impact COVID selon le régime de la date
+    low, high = covid_bounds(dates)
+    prix *= rng.uniform(low[:, None], high[:, None], shape)
+
+    # Volatilité quotidienne et bruit
+    prix *= rng.uniform(0.92, 1.08, shape)
+    prix *= rng.uniform(0.95, 1.05, shape)
+
+    volume = rng.uniform(0.3, 3.0, shape)
+    volume *= volume_moyen
+    caps = rng.uniform(0.9, 1.1, shape)
+    caps *= market_cap
+
+    return {
+        'dates': dates,
+        'symboles': symboles,
+        'prix': prix,
+        'volume': volume,
+        'market_cap': caps
+    }
+
+
+def matrices_to_frame(matrices, entreprises):
+    """Construit la table longue (date, symbole) à partir des matrices générées"""
+    dates = matrices['dates']
+    n_dates, n_symboles = matrices['prix'].shape
+    symboles = np.array(matrices['symboles'], dtype=object)
+    secteurs = np.array([entreprises[s]['secteur'] for s in matrices['symboles']], dtype=object)
+
+    return pd.DataFrame({
+        'date': dates.repeat(n_symboles),
+        'symbole': np.tile(symboles, n_dates),
+        'prix': matrices['prix'].ravel(),
+        'volume': matrices['volume'].ravel(),
+        'secteur': np.tile(secteurs, n_dates),
+        'market_cap': matrices['market_cap'].ravel()
+    })
+
+
+def synthetic_entreprises(n, seed=DEFAULT_SEED):
+    """Crée un univers synthétique de n entreprises au format de define_entreprises"""
+    rng = np.random.default_rng(seed)
+    market_caps = rng.uniform(20e6, 300e6, n)
+    poids = rng.uniform(1, 25, n)
+    entreprises = {}
+    for i in range(n):
+        secteur = SECTEURS_SYNTHETIQUES[i % len(SECTEURS_SYNTHETIQUES)]
+        entreprises[f'SYN{i:05d}'] = {
+            'nom_complet': f'Entreprise Synthétique {i}',
+            'secteur': secteur,
+            'sous_secteur': secteur,
+            'pays': 'Madagascar',
+            'couleur': '#007E3A',
+            'poids_indice': round(float(poids[i]), 1),
+            'market_cap': float(market_caps[i]),
+            'dividende_yield': round(float(rng.uniform(1, 6)), 1),
+            'volume_moyen': int(rng.uniform(10000, 90000)),
+            'description': 'Entreprise générée pour les tests de charge'
+        }
+    return entreprises
@@ -0,0 +1,242 @@
+# sources.py
+"""Sources de données réelles: fichiers CSV/Parquet, flux HTTP de cotations et serveur local de substitution"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from simulation import CHAMPS_MATRICE
+
+COLONNES_ECONOMIE = ['date', 'inflation', 'croissance_pib', 'taux_directeur', 'taux_change_usd',
+                     'taux_change_eur', 'reserves_devises', 'dette_publique']
+# Symboles par requête du flux HTTP: une requête par lot, jamais une par symbole
+TAILLE_LOT = 200
+
+
+class DataSource:
+    """Interface commune des sources: chaque méthode retourne None pour un jeu non fourni (simulation)"""
+
+    name = 'simulation'
+
+    def __str__(self):
+        return self.name
+
+    def provides(self, jeu):
+        """Indique si la source fournit le jeu ('historique', 'economie' ou 'cotations')"""
+        return False
+
+    def history(self, entreprises):
+        """Matrices (dates × symboles) au format de generate_price_matrices"""
+        return None
+
+    def economic(self):
+        """Table mensuelle des indicateurs économiques"""
+        return None
+
+    def quotes(self, symboles):
+        """Derniers prix et volumes alignés sur symboles (NaN pour un symbole sans cotation)"""
+        return None
+
+
+class FileSource(DataSource):
+    """Jeux lus dans un répertoire: historique, economie et cotations, en .parquet ou .csv"""
+
+    def __init__(self, repertoire):
+        self.repertoire = Path(repertoire)
+        self.name = f'fichiers:{self.repertoire}'
+
+    def provides(self, jeu):
+        return self._path(jeu) is not None
+
+    def history(self, entreprises):
+        """Historique long (date, symbole, prix, volume, market_cap) pivoté en matrices dans l'ordre de l'univers"""
+        frame = self._read('historique', parse_dates=['date'])
+        if frame is None:
+            return None
+        chemin = self._path('historique')
+        absents = sorted(set(entreprises) - set(frame['symbole']))
+        if absents:
+            raise ValueError(f"Symboles absents de {chemin}: {', '.join(absents)}")
+        doublons = frame.duplicated(['date', 'symbole'])
+        if doublons.any():
+            raise ValueError(f"Lignes (date, symbole) en double dans {chemin}: "
+                             f"{', '.join(sorted(set(frame.loc[doublons, 'symbole'])))}")
+        # Aucune valeur inventée: une cellule manquante (avant cotation ou trou) rejette le fichier
+        larges = {champ: frame.pivot(index='date', columns='symbole', values=champ)
+                  .sort_index().reindex(columns=list(entreprises)) for champ in CHAMPS_MATRICE}
+        incomplets = sorted({s for large in larges.values() for s in large.columns[large.isna().any()]})
+        if incomplets:
+            raise ValueError(f"Historique incomplet dans {chemin} (dates manquantes): {', '.join(incomplets)}")
+        dates = larges['prix'].index
+        return dict({champ: np.ascontiguousarray(larges[champ], dtype=float) for champ in CHAMPS_MATRICE},
+                    dates=pd.DatetimeIndex(dates), symboles=list(entreprises))
+
+    def economic(self):
+        frame = self._read('economie', parse_dates=['date'])
+        if frame is None:
+            return None
+        return frame[COLONNES_ECONOMIE].sort_values('date', ignore_index=True)
+
+    def quotes(self, symboles):
+        """Instantané de cotations (symbole, prix, volume), relu à chaque appel"""
+        frame = self._read('cotations')
+        if frame is None:
+            return None
+        return align_quotes(frame, symboles)
+
+    def _path(self, jeu):
+        for extension in ('.parquet', '.csv'):
+            chemin = self.repertoire / f'{jeu}{extension}'
+            if chemin.exists():
+                return chemin
+        return None
+
+    def _read(self, jeu, parse_dates=None):
+        chemin = self._path(jeu)
+        if chemin is None:
+            return None
+        if chemin.suffix == '.parquet':
+            # Moteur Parquet (pyarrow ou fastparquet) requis seulement pour ces fichiers
+            frame = pd.read_parquet(chemin)
+            for colonne in parse_dates or []:
+                frame[colonne] = pd.to_datetime(frame[colonne])
+            return frame
+        return pd.read_csv(chemin, parse_dates=parse_dates)
+
+
+class HttpQuoteFeed(DataSource):
+    """Flux de cotations HTTP: requêtes par lots de symboles, connexions réutilisées et reprises avec backoff"""
+
+    def __init__(self, url, taille_lot=TAILLE_LOT, connexions=4, timeout=5, tentatives=3, backoff=0.2):
+        self.url = url.rstrip('/')
+        self.name = f'http:{self.url}'
+        self.taille_lot = taille_lot
+        self.connexions = connexions
+        self.timeout = timeout
+        # Reprises gérées par urllib3 (erreurs réseau et 429/5xx), délai doublé à chaque tentative
+        reprises = Retry(total=tentatives, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504),
+                         allowed_methods=['GET'])
+        adaptateur = HTTPAdapter(pool_connections=1, pool_maxsize=connexions, max_retries=reprises)
+        self.session = requests.Session()
+        self.session.mount('http://', adaptateur)
+        self.session.mount('https://', adaptateur)
+        self._pool = ThreadPoolExecutor(max_workers=connexions, thread_name_prefix='flux-cotations')
+
+    def provides(self, jeu):
+        return jeu == 'cotations'
+
+    def quotes(self, symboles):
+        """Cotations de tous les symboles, lots interrogés en parallèle sur le pool de connexions"""
+        symboles = list(symboles)
+        lots = [symboles[i:i + self.taille_lot] for i in range(0, len(symboles), self.taille_lot)]
+        reponses = list(self._pool.map(self._fetch, lots))
+        return align_quotes(pd.DataFrame([c for reponse in reponses for c in reponse],
+                                         columns=['symbole', 'prix', 'volume']), symboles)
+
+    def close(self):
+        """Ferme les connexions du pool"""
+        self._pool.shutdown(wait=False)
+        self.session.close()
+
+    def _fetch(self, lot):
+        reponse = self.session.get(f'{self.url}/quotes', params={'symboles': ','.join(lot)}, timeout=self.timeout)
+        reponse.raise_for_status()
+        return reponse.json()['cotations']
+
+
+def align_quotes(frame, symboles):
+    """Prix et volumes d'une table (symbole, prix, volume) réordonnés selon symboles"""
+    alignes = frame.drop_duplicates('symbole', keep='last').set_index('symbole').reindex(list(symboles))
+    return {'prix': alignes['prix'].to_numpy(dtype=float), 'volume': alignes['volume'].to_numpy(dtype=float)}
+
+
+class MockQuoteServer:
+    """Serveur HTTP local qui imite le flux de cotations (marche aléatoire, latence et erreurs injectables)"""
+
+    def __init__(self, entreprises, port=0, latence=0.0, taux_erreur=0.0, seed=None):
+        self.latence = latence
+        self.taux_erreur = taux_erreur
+        self.rng = np.random.default_rng(seed)
+        self.positions = {symbole: j for j, symbole in enumerate(entreprises)}
+        self.prix = np.array([info['market_cap'] / 1e6 * 0.2 for info in entreprises.values()])
+        self.volume = np.array([float(info['volume_moyen']) for info in entreprises.values()])
+        # Compteurs pour vérifier le regroupement des requêtes et les reprises
+        self.requetes = 0
+        self.erreurs = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """Adresse de base du serveur"""
+        return f'http://127.0.0.1:{self._server.server_address[1]}'
+
+    def start(self):
+        """Démarre le serveur dans un thread démon"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='flux-local', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Arrête le serveur et libère le port"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def respond(self, symboles):
+        """Code HTTP et corps JSON d'une requête de cotations"""
+        with self._lock:
+            self.requetes += 1
+            if self.rng.random() < self.taux_erreur:
+                self.erreurs += 1
+                return 503, {'erreur': 'indisponible'}
+            symboles = [s for s in symboles if s in self.positions]
+            idx = np.array([self.positions[s] for s in symboles], dtype=np.intp)
+            self.prix[idx] *= 1 + self.rng.uniform(-0.02, 0.02, idx.size)
+            self.volume[idx] *= self.rng.uniform(0.9, 1.1, idx.size)
+            cotations = [{'symbole': s, 'prix': p, 'volume': v}
+                         for s, p, v in zip(symboles, self.prix[idx].tolist(), self.volume[idx].tolist())]
+        return 200, {'cotations': cotations}
+
+    def _handler(self):
+        serveur = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                requete = urlparse(self.path)
+                if requete.path != '/quotes':
+                    self.send_error(404)
+                    return
+                if serveur.latence:
+                    time.sleep(serveur.latence)
+                symboles = parse_qs(requete.query).get('symboles', [''])[0].split(',')
+                code, corps = serveur.respond([s for s in symboles if s])
+                contenu = json.dumps(corps).encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(contenu)))
+                self.end_headers()
+                self.wfile.write(contenu)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
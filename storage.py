@@ -0,0 +1,127 @@
+# storage.py
+"""Stockage local en colonnes (fichiers .npy mappés en mémoire) des jeux de données générés"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cache import universe_fingerprint
+from history import CHAMPS_MATRICE, PriceHistory
+
+SCHEMA_VERSION = 1
+STORE_DIR = Path(__file__).resolve().parent / 'data_store'
+# Écritures sérialisées pour tout le processus (chaque session a son DataStore): la plus récente gagne
+_ecritures = threading.RLock()
+
+
+class DataStore:
+    """Magasin versionné: un répertoire par (univers, graine), une colonne par fichier .npy"""
+
+    def __init__(self, racine=STORE_DIR):
+        self.racine = Path(racine)
+
+    def dataset_dir(self, nom, entreprises, seed, parallele=False):
+        """Répertoire d'un jeu de données pour un univers, une graine et un mode de génération donnés"""
+        # Génération parallèle: flux aléatoires par shard, donc des séries différentes à graine égale
+        if parallele:
+            nom = f'{nom}-parallele'
+        return self.racine / f"{universe_fingerprint(entreprises)[:16]}-seed{seed}" / nom
+
+    def save_history(self, history):
+        """Persiste les matrices de l'historique et l'état du générateur aléatoire"""
+        with _ecritures:
+            # Bloc et flux aléatoire relevés ensemble: une clôture concurrente n'est jamais à moitié écrite
+            with history._lock:
+                block = history.matrix.block()
+                colonnes = {champ: np.ascontiguousarray(block[champ]) for champ in CHAMPS_MATRICE}
+                colonnes['dates'] = block['dates'].asi8
+                manifest = {
+                    'symboles': list(block['symboles']),
+                    'start': str(history.start.date()),
+                    'last_date': str(history.last_date.date()) if history.last_date is not None else None,
+                    'rng_state': history.rng.bit_generator.state
+                }
+            self._write(self.dataset_dir('historical_data', history.entreprises, history.seed,
+                                         parallele=history.workers is not None), colonnes, manifest, history.seed)
+
+    def load_history(self, entreprises, seed, start, workers=None):
+        """Recharge un historique persisté (None si absent ou incompatible)"""
+        lecture = self._read(self.dataset_dir('historical_data', entreprises, seed, parallele=workers is not None),
+                             seed)
+        if lecture is None:
+            return None
+        colonnes, manifest = lecture
+        if manifest['symboles'] != list(entreprises) or manifest['start'] != str(pd.Timestamp(start).date()):
+            return None
+
+        history = PriceHistory(entreprises, seed, start=start, workers=workers)
+        if len(colonnes['dates']):
+            matrices = {champ: colonnes[champ] for champ in CHAMPS_MATRICE}
+            matrices['dates'] = pd.DatetimeIndex(colonnes['dates'].astype('datetime64[ns]'))
+            matrices['symboles'] = manifest['symboles']
+            history.load(matrices, manifest['rng_state'])
+        return history
+
+    def save_frame(self, nom, entreprises, seed, frame, **metadonnees):
+        """Persiste un DataFrame colonne par colonne (dates en int64, textes en unicode fixe)"""
+        colonnes, types = {}, {}
+        for colonne in frame.columns:
+            serie = frame[colonne]
+            if pd.api.types.is_datetime64_any_dtype(serie):
+                colonnes[colonne], types[colonne] = serie.to_numpy('datetime64[ns]').view('int64'), 'datetime'
+            elif pd.api.types.is_numeric_dtype(serie):
+                colonnes[colonne], types[colonne] = serie.to_numpy(), 'numeric'
+            else:
+                colonnes[colonne], types[colonne] = serie.to_numpy(dtype=str), 'text'
+        manifest = {'colonnes': list(frame.columns), 'types': types, 'metadonnees': metadonnees}
+        self._write(self.dataset_dir(nom, entreprises, seed), colonnes, manifest, seed)
+
+    def load_frame(self, nom, entreprises, seed):
+        """Recharge un DataFrame persisté, retourne (frame, métadonnées) ou None"""
+        lecture = self._read(self.dataset_dir(nom, entreprises, seed), seed)
+        if lecture is None:
+            return None
+        colonnes, manifest = lecture
+        donnees = {}
+        for colonne in manifest['colonnes']:
+            valeurs = colonnes[colonne]
+            if manifest['types'][colonne] == 'datetime':
+                valeurs = valeurs.view('datetime64[ns]')
+            elif manifest['types'][colonne] == 'text':
+                valeurs = valeurs.astype(object)
+            donnees[colonne] = valeurs
+        return pd.DataFrame(donnees, columns=manifest['colonnes']), manifest['metadonnees']
+
+    def _write(self, repertoire, colonnes, manifest, seed):
+        # Écriture dans un répertoire temporaire puis renommage: un lecteur ne voit jamais un état partiel
+        repertoire.parent.mkdir(parents=True, exist_ok=True)
+        temporaire = Path(tempfile.mkdtemp(prefix=f'.{repertoire.name}-', dir=repertoire.parent))
+        for nom, valeurs in colonnes.items():
+            np.save(temporaire / f'{nom}.npy', valeurs, allow_pickle=False)
+        manifest = dict(manifest, schema_version=SCHEMA_VERSION, seed=seed, colonnes_fichiers=list(colonnes))
+        (temporaire / 'manifest.json').write_text(json.dumps(manifest, ensure_ascii=False, default=str),
+                                                  encoding='utf-8')
+        # Ancienne version déplacée sous un nom propre à cette écriture (unique comme le temporaire)
+        ancien = temporaire.with_name(f'{temporaire.name}-old')
+        with _ecritures:
+            if repertoire.exists():
+                os.replace(repertoire, ancien)
+            os.replace(temporaire, repertoire)
+        shutil.rmtree(ancien, ignore_errors=True)
+
+    def _read(self, repertoire, seed):
+        chemin_manifest = repertoire / 'manifest.json'
+        if not chemin_manifest.exists():
+            return None
+        manifest = json.loads(chemin_manifest.read_text(encoding='utf-8'))
+        if manifest.get('schema_version') != SCHEMA_VERSION or manifest.get('seed') != seed:
+            return None
+        # Lecture sans copie: les colonnes restent mappées en mémoire
+        colonnes = {nom: np.load(repertoire / f'{nom}.npy', mmap_mode='r', allow_pickle=False)
+                    for nom in manifest['colonnes_fichiers']}
+        return colonnes, manifest
@@ -0,0 +1,259 @@
+# streaming.py
+"""Pipeline asyncio du carnet live: flux TCP de ticks, regroupement par symbole et instantanés à cadence fixe"""
+import asyncio
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Instantanés publiés par seconde: les rafales de ticks entre deux images sont fusionnées par symbole
+FREQUENCE_IMAGES = 5
+TAILLE_LECTURE = 1 << 16
+# Délais de reconnexion au producteur (s), doublés jusqu'au plafond
+RECONNEXION_MIN = 0.1
+RECONNEXION_MAX = 5.0
+# Attente maximale (s) d'une publication forcée depuis le script Streamlit
+DELAI_PUBLICATION = 5.0
+
+
+class QuotePipeline:
+    """Consomme un flux de lignes 'symbole;prix;volume' et publie le carnet à cadence fixe dans un thread dédié"""
+
+    def __init__(self, engine, host, port, frequence=FREQUENCE_IMAGES):
+        self.engine = engine
+        self.host = host
+        self.port = port
+        self.interval = 1 / frequence
+        self._positions = {symbole.encode(): j for j, symbole in enumerate(engine.static['symbole'])}
+        # Dernière cotation reçue par symbole depuis l'image précédente (les rafales s'écrasent)
+        self._en_attente = {}
+        self._premier_recu = None
+        self.last_tick = time.time()
+        self.last_error = None
+        # Compteurs: ticks reçus, cotations appliquées après regroupement, images publiées
+        # et âge (s) du plus ancien tick de chaque image
+        self.ticks = 0
+        self.cotations = 0
+        self.images = 0
+        self.latences = deque(maxlen=1000)
+        self._loop = None
+        self._thread = None
+        self._stop = None
+
+    @property
+    def version(self):
+        return self.engine.version
+
+    def start(self):
+        """Démarre la boucle asyncio du pipeline dans un thread démon (idempotent)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self._run(),),
+                                            name='madagascar-flux', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Arrête le pipeline et attend la fin de son thread"""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join()
+
+    def tick_now(self):
+        """Publie immédiatement les cotations en attente (bouton de rafraîchissement manuel)"""
+        if self._loop is not None:
+            publication = asyncio.run_coroutine_threadsafe(self._publish_safely(), self._loop)
+            try:
+                publication.result(timeout=DELAI_PUBLICATION)
+            except TimeoutError as erreur:
+                # Boucle bloquée: le script n'attend pas, l'incident est signalé dans la sidebar
+                publication.cancel()
+                self.last_error = erreur
+
+    def snapshot(self):
+        """Dernier carnet publié (DataFrame reconstruit une fois par image, en lecture seule)"""
+        return self.engine.frame()
+
+    async def _run(self):
+        self._stop = asyncio.Event()
+        taches = [asyncio.create_task(self._consume()), asyncio.create_task(self._publish_loop())]
+        await self._stop.wait()
+        for tache in taches:
+            tache.cancel()
+        await asyncio.gather(*taches, return_exceptions=True)
+
+    async def _consume(self):
+        delai = RECONNEXION_MIN
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as erreur:
+                self.last_error = erreur
+                await asyncio.sleep(delai)
+                delai = min(2 * delai, RECONNEXION_MAX)
+                continue
+            delai = RECONNEXION_MIN
+            self.last_error = None
+            try:
+                await self._read(reader)
+            except OSError as erreur:
+                self.last_error = erreur
+            finally:
+                writer.close()
+
+    async def _read(self, reader):
+        reste = b''
+        while True:
+            bloc = await reader.read(TAILLE_LECTURE)
+            if not bloc:
+                raise ConnectionResetError('flux de ticks fermé par le producteur')
+            if self._premier_recu is None:
+                self._premier_recu = time.perf_counter()
+            lignes = (reste + bloc).split(b'\n')
+            reste = lignes.pop()
+            # Tampon relu à chaque bloc: la publication l'échange contre un tampon vide
+            en_attente = self._en_attente
+            for ligne in lignes:
+                try:
+                    symbole, prix, volume = ligne.split(b';')
+                except ValueError:
+                    # Ligne mal formée ignorée, le flux continue
+                    continue
+                en_attente[symbole] = (prix, volume)
+                self.ticks += 1
+            # Une lecture servie depuis le tampon ne suspend pas: on rend la main pour que les images partent à l'heure
+            await asyncio.sleep(0)
+
+    async def _publish_loop(self):
+        # Échéances fixes: le temps de publication ne décale pas la cadence des images
+        loop = asyncio.get_running_loop()
+        echeance = loop.time()
+        while True:
+            echeance += self.interval
+            await asyncio.sleep(max(0.0, echeance - loop.time()))
+            await self._publish_safely()
+
+    async def _publish_safely(self):
+        # Une image en échec (carnet, abonné) est signalée sans arrêter les suivantes
+        try:
+            await self._publish()
+        except Exception as erreur:
+            self.last_error = erreur
+
+    async def _publish(self):
+        if not self._en_attente:
+            return
+        # Échange du tampon: les ticks reçus pendant l'application iront dans l'image suivante
+        en_attente, self._en_attente = self._en_attente, {}
+        premier_recu, self._premier_recu = self._premier_recu, None
+        prix = np.full(len(self.engine), np.nan)
+        volume = np.full(len(self.engine), np.nan)
+        for symbole, (p, v) in en_attente.items():
+            j = self._positions.get(symbole)
+            if j is not None:
+                try:
+                    prix[j], volume[j] = float(p), float(v)
+                except ValueError:
+                    continue
+        self.engine.apply_quotes(prix, volume)
+        self.cotations += len(en_attente)
+        # Le DataFrame est construit ici, une fois par image: le script Streamlit ne fait que le relire
+        self.engine.frame()
+        self.images += 1
+        self.last_tick = time.time()
+        self.latences.append(time.perf_counter() - premier_recu)
+
+
+class TickProducer:
+    """Producteur TCP local de ticks (marche aléatoire), substitut d'un flux de marché réel"""
+
+    def __init__(self, entreprises, port=0, cadence=None, taille_rafale=1000, seed=None):
+        self.symboles = [symbole.encode() for symbole in entreprises]
+        self.prix = np.array([info['market_cap'] / 1e6 * 0.2 for info in entreprises.values()])
+        self.volume = np.array([float(info['volume_moyen']) for info in entreprises.values()])
+        # Ticks par seconde et par client (None: aussi vite que le client les lit)
+        self.cadence = cadence
+        self.taille_rafale = taille_rafale
+        self.rng = np.random.default_rng(seed)
+        self.port = port
+        self.envoyes = 0
+        self._pret = threading.Event()
+        self._clients = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Démarre le serveur dans un thread démon et attend qu'il écoute"""
+        self._thread = threading.Thread(target=self._serve, name='producteur-ticks', daemon=True)
+        self._thread.start()
+        self._pret.wait()
+        return self
+
+    def stop(self):
+        """Arrête le serveur et ferme les connexions"""
+        self._loop.call_soon_threadsafe(self._server.close)
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def burst(self):
+        """Rafale de ticks encodée: symboles tirés au hasard, chocs de prix multiplicatifs"""
+        idx = self.rng.integers(0, len(self.symboles), self.taille_rafale)
+        self.prix[idx] *= 1 + self.rng.uniform(-0.01, 0.01, idx.size)
+        self.volume[idx] *= self.rng.uniform(0.9, 1.1, idx.size)
+        return b''.join(b'%s;%.6f;%.0f\n' % (self.symboles[j], p, v)
+                        for j, p, v in zip(idx.tolist(), self.prix[idx].tolist(), self.volume[idx].tolist()))
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._main())
+
+    async def _main(self):
+        self._server = await asyncio.start_server(self._client, '127.0.0.1', self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._pret.set()
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        # Serveur fermé: les connexions en cours sont interrompues aussi
+        for client in self._clients:
+            client.cancel()
+        await asyncio.gather(*self._clients, return_exceptions=True)
+
+    async def _client(self, reader, writer):
+        pause = self.taille_rafale / self.cadence if self.cadence else 0
+        tache = asyncio.current_task()
+        self._clients.add(tache)
+        try:
+            while True:
+                writer.write(self.burst())
+                await writer.drain()
+                self.envoyes += self.taille_rafale
+                await asyncio.sleep(pause)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._clients.discard(tache)
+            writer.close()
+
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def shared_pipeline(key, engine_factory, host, port, frequence=FREQUENCE_IMAGES):
+    """Retourne le pipeline du processus associé à la clé, en le créant au premier appel"""
+    with _pipelines_lock:
+        pipeline = _pipelines.get(key)
+        if pipeline is None:
+            pipeline = QuotePipeline(engine_factory(), host, port, frequence)
+            _pipelines[key] = pipeline
+        return pipeline.start()
@@ -0,0 +1,98 @@
+# tests/test_bars.py
+"""Barres intraday: agrégées, elles redonnent l'OHLCV de la séance du carnet; clôture et séance suivante"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import tick_engine
+from bars import PERIODES_BARRES
+from benchmark import quote_frame
+from simulation import synthetic_entreprises
+from tick_engine import TickEngine
+
+
+@pytest.fixture
+def horloge(monkeypatch):
+    # Horloge du moteur (heure locale) avancée à la main: les ticks couvrent plusieurs minutes en un instant
+    instant = [datetime(2026, 3, 10, 9).timestamp()]
+    monkeypatch.setattr(tick_engine, 'time', SimpleNamespace(time=lambda: instant[0]))
+    return instant
+
+
+@pytest.fixture
+def moteur(horloge):
+    rng = np.random.default_rng(4)
+    return TickEngine(quote_frame(synthetic_entreprises(12), rng), rng=rng, barres=True)
+
+
+def seance_des_barres(barres):
+    # OHLCV quotidien reconstruit à partir des barres d'une période, par symbole
+    barres = barres.sort_values('date', kind='stable')
+    return barres.groupby('symbole', sort=False).agg(
+        ouverture=('ouverture', 'first'), plus_haut=('plus_haut', 'max'), plus_bas=('plus_bas', 'min'),
+        cloture=('cloture', 'last'), volume=('volume', 'sum'))
+
+
+def avancer(moteur, horloge, n_ticks, pas=7):
+    for _ in range(n_ticks):
+        horloge[0] += pas
+        moteur.tick()
+
+
+@pytest.mark.parametrize('periode', list(PERIODES_BARRES))
+def test_bars_add_up_to_the_session(moteur, horloge, periode):
+    avancer(moteur, horloge, 600)
+    seance = seance_des_barres(moteur.bars.frame(periode)).loc[moteur.static['symbole']]
+    assert np.allclose(seance['ouverture'], moteur.ouverture)
+    assert np.allclose(seance['plus_haut'], moteur.plus_haut)
+    assert np.allclose(seance['plus_bas'], moteur.plus_bas)
+    assert np.allclose(seance['cloture'], moteur.prix)
+    assert np.allclose(seance['volume'], moteur.volume)
+
+
+def test_bars_are_aligned_on_their_period(moteur, horloge):
+    avancer(moteur, horloge, 200)
+    for periode, secondes in PERIODES_BARRES.items():
+        debuts = moteur.bars.frame(periode)['date'].drop_duplicates()
+        assert (debuts.astype('int64') // 10 ** 9 % secondes == 0).all()
+        assert debuts.is_monotonic_increasing
+
+
+def test_session_close_reports_the_bars_and_opens_the_next_day(moteur, horloge):
+    avancer(moteur, horloge, 300)
+    barres = seance_des_barres(moteur.bars.frame('5min')).loc[moteur.static['symbole']]
+    recues = []
+    moteur.session_listeners['test'] = recues.append
+    seance = moteur.close_session()
+    assert recues == [seance] and seance['date'] == pd.Timestamp('2026-03-10')
+    for champ in ('ouverture', 'plus_haut', 'plus_bas', 'cloture', 'volume'):
+        assert np.allclose(seance[champ], barres[champ])
+    # Séance suivante: jour suivant, ouverte au dernier cours, une seule barre (le carnet d'ouverture)
+    assert moteur.bars.date == pd.Timestamp('2026-03-11')
+    assert np.array_equal(moteur.ouverture, seance['cloture'])
+    ouverture = moteur.bars.frame('1min')
+    assert len(ouverture) == len(moteur) and (ouverture['date'] == pd.Timestamp('2026-03-11')).all()
+
+
+def test_midnight_closes_the_session_before_the_tick(moteur, horloge):
+    recues = []
+    moteur.session_listeners['test'] = recues.append
+    avancer(moteur, horloge, 10)
+    horloge[0] = datetime(2026, 3, 11, 0, 0, 3).timestamp()
+    moteur.tick()
+    assert [seance['date'] for seance in recues] == [pd.Timestamp('2026-03-10')]
+    assert moteur.bars.date == pd.Timestamp('2026-03-11')
+    seance = seance_des_barres(moteur.bars.frame('1h')).loc[moteur.static['symbole']]
+    assert np.allclose(seance['cloture'], moteur.prix)
+    assert np.allclose(seance['volume'], moteur.volume)
+
+
+def test_failing_listener_is_recorded_not_raised(moteur):
+    def echoue(seance):
+        raise OSError('disque plein')
+    moteur.session_listeners['test'] = echoue
+    moteur.close_session()
+    assert isinstance(moteur.last_error, OSError)
@@ -0,0 +1,67 @@
+# tests/test_index_engine.py
+"""Indice pondéré: niveau live incrémental contre somme complète du carnet, niveaux historiques par blocs"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark import quote_frame
+from index_engine import IndexEngine
+from simulation import generate_price_matrices, synthetic_entreprises
+from tick_engine import TickEngine
+
+
+@pytest.fixture
+def entreprises():
+    return synthetic_entreprises(200)
+
+
+@pytest.fixture
+def matrices(entreprises):
+    dates = pd.date_range('2020-01-01', periods=30, freq='D')
+    return generate_price_matrices(entreprises, dates, np.random.default_rng(5))
+
+
+def niveaux_complets(indice, prix):
+    ponderes = prix * indice.poids
+    secteurs = np.bincount(indice.codes, weights=ponderes, minlength=len(indice.secteurs))
+    return ponderes.sum() / indice.diviseur, secteurs / indice.diviseurs_secteurs
+
+
+@pytest.mark.parametrize('probabilite', [0.01, 0.1, 0.4])
+def test_live_level_matches_full_sum(entreprises, matrices, probabilite):
+    # 1% et 10% du carnet: écarts seuls; 40%: resommation complète
+    indice = IndexEngine(entreprises)
+    indice.update(matrices)
+    rng = np.random.default_rng(1)
+    moteur = TickEngine(quote_frame(entreprises, rng), rng=rng, probabilite=probabilite)
+    indice.attach(moteur)
+    for _ in range(300):
+        moteur.tick()
+        niveau, secteurs = niveaux_complets(indice, moteur.prix)
+        assert indice.live_level() == pytest.approx(niveau, rel=1e-12)
+    assert np.allclose(indice.live_sector_levels().to_numpy(), secteurs, rtol=1e-12)
+
+
+def test_quotes_from_a_source_follow_the_same_level(entreprises, matrices):
+    indice = IndexEngine(entreprises)
+    indice.update(matrices)
+    rng = np.random.default_rng(2)
+    moteur = TickEngine(quote_frame(entreprises, rng))
+    indice.attach(moteur)
+    for _ in range(50):
+        prix = np.full(len(moteur), np.nan)
+        modifies = rng.choice(len(moteur), 3, replace=False)
+        prix[modifies] = moteur.prix[modifies] * rng.uniform(0.95, 1.05, 3)
+        moteur.apply_quotes(prix, np.full(len(moteur), np.nan))
+    assert indice.live_level() == pytest.approx(niveaux_complets(indice, moteur.prix)[0], rel=1e-12)
+
+
+def test_history_blocks_give_the_same_levels(entreprises, matrices):
+    complet = IndexEngine(entreprises)
+    complet.update(matrices)
+    par_blocs = IndexEngine(entreprises)
+    for debut, fin in ((0, 10), (10, 11), (11, 30)):
+        par_blocs.update({'dates': matrices['dates'][debut:fin], 'prix': matrices['prix'][debut:fin]})
+    pd.testing.assert_frame_equal(par_blocs.levels, complet.levels)
+    pd.testing.assert_frame_equal(par_blocs.sector_levels, complet.sector_levels)
+    assert complet.levels['indice'].iloc[0] == pytest.approx(complet.base)
@@ -0,0 +1,115 @@
+# tests/test_sources.py
+"""Sources de données: flux HTTP par lots et reprises contre le serveur local, alignement, fichiers"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark import quote_frame
+from scheduler import RefreshScheduler
+from simulation import synthetic_entreprises
+from sources import FileSource, HttpQuoteFeed, MockQuoteServer, align_quotes
+from tick_engine import TickEngine
+
+
+@pytest.fixture
+def entreprises():
+    return synthetic_entreprises(450)
+
+
+def test_quotes_are_fetched_in_batches(entreprises):
+    with MockQuoteServer(entreprises, seed=1) as serveur:
+        flux = HttpQuoteFeed(serveur.url, taille_lot=200)
+        try:
+            cotations = flux.quotes(list(entreprises))
+        finally:
+            flux.close()
+        assert serveur.requetes == 3
+        # Cotations réordonnées selon les symboles demandés
+        assert np.array_equal(cotations['prix'], serveur.prix)
+        assert np.array_equal(cotations['volume'], serveur.volume)
+
+
+def test_unknown_symbols_are_nan(entreprises):
+    symboles = list(entreprises)[:5] + ['INCONNU']
+    with MockQuoteServer(entreprises, seed=1) as serveur:
+        flux = HttpQuoteFeed(serveur.url)
+        try:
+            cotations = flux.quotes(symboles)
+        finally:
+            flux.close()
+    assert np.isfinite(cotations['prix'][:5]).all()
+    assert np.isnan(cotations['prix'][5]) and np.isnan(cotations['volume'][5])
+
+
+def test_server_errors_are_retried(entreprises):
+    with MockQuoteServer(entreprises, taux_erreur=0.5, seed=3) as serveur:
+        flux = HttpQuoteFeed(serveur.url, taille_lot=50, tentatives=10, backoff=0)
+        try:
+            cotations = flux.quotes(list(entreprises))
+        finally:
+            flux.close()
+        assert serveur.erreurs > 0
+        assert serveur.requetes == 9 + serveur.erreurs
+    assert np.isfinite(cotations['prix']).all()
+
+
+def test_exhausted_retries_raise_oserror(entreprises):
+    # Le ticker intercepte OSError pour garder les dernières cotations
+    with MockQuoteServer(entreprises, taux_erreur=1.0, seed=3) as serveur:
+        flux = HttpQuoteFeed(serveur.url, tentatives=2, backoff=0)
+        try:
+            with pytest.raises(OSError):
+                flux.quotes(list(entreprises)[:10])
+        finally:
+            flux.close()
+        assert serveur.requetes == 3
+
+
+class SourceMalFormee:
+    def quotes(self, symboles):
+        return {}['cotations']
+
+
+def test_malformed_quotes_are_reported_not_raised(entreprises):
+    moteur = TickEngine(quote_frame(entreprises, np.random.default_rng(0)))
+    ticker = RefreshScheduler(moteur, source=SourceMalFormee())
+    ticker.tick_now()
+    assert isinstance(ticker.last_error, KeyError)
+    assert moteur.version == 0
+
+
+def test_align_quotes_orders_and_keeps_last_duplicate():
+    frame = pd.DataFrame({'symbole': ['B', 'A', 'B', 'Z'], 'prix': [1.0, 2.0, 3.0, 9.0],
+                          'volume': [10.0, 20.0, 30.0, 90.0]})
+    alignes = align_quotes(frame, ['A', 'B', 'C'])
+    np.testing.assert_array_equal(alignes['prix'], [2.0, 3.0, np.nan])
+    np.testing.assert_array_equal(alignes['volume'], [20.0, 30.0, np.nan])
+
+
+def historique(dates, symboles):
+    return pd.DataFrame([(date, symbole, 10.0 + i, 1000.0, 1e6) for i, date in enumerate(dates)
+                         for symbole in symboles], columns=['date', 'symbole', 'prix', 'volume', 'market_cap'])
+
+
+def test_file_history_is_pivoted_in_universe_order(tmp_path):
+    dates = pd.date_range('2024-01-01', periods=3)
+    historique(dates, ['B', 'A']).to_csv(tmp_path / 'historique.csv', index=False)
+    matrices = FileSource(tmp_path).history({'A': {}, 'B': {}})
+    assert matrices['symboles'] == ['A', 'B']
+    assert matrices['dates'].equals(dates)
+    np.testing.assert_array_equal(matrices['prix'][:, 0], [10.0, 11.0, 12.0])
+
+
+def test_file_history_rejects_missing_dates(tmp_path):
+    frame = historique(pd.date_range('2024-01-01', periods=3), ['A', 'B'])
+    # B coté à partir du deuxième jour: aucun prix inventé avant sa cotation
+    frame.drop(index=1).to_csv(tmp_path / 'historique.csv', index=False)
+    with pytest.raises(ValueError, match='incomplet'):
+        FileSource(tmp_path).history({'A': {}, 'B': {}})
+
+
+def test_file_history_rejects_duplicates(tmp_path):
+    frame = historique(pd.date_range('2024-01-01', periods=3), ['A', 'B'])
+    pd.concat([frame, frame.iloc[:1]]).to_csv(tmp_path / 'historique.csv', index=False)
+    with pytest.raises(ValueError, match='double'):
+        FileSource(tmp_path).history({'A': {}, 'B': {}})
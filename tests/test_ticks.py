@@ -0,0 +1,66 @@
+# tests/test_ticks.py
+"""Tampon circulaire des ticks: fenêtres contiguës après débordement, lecture seule, carnet amorcé"""
+import numpy as np
+import pytest
+
+from benchmark import quote_frame
+from simulation import synthetic_entreprises
+from tick_engine import TickEngine
+from ticks import TickRing
+
+CAPACITE = 16
+
+
+def remplir(tampon, n_ticks, rng):
+    # Historique complet conservé à part pour comparer avec le tampon
+    recus = [[] for _ in range(len(tampon))]
+    for k in range(n_ticks):
+        idx = np.flatnonzero(rng.random(len(tampon)) < 0.5)
+        prix = rng.uniform(10, 20, idx.size)
+        tampon.record(idx, float(k), prix, prix * 100)
+        for j, p in zip(idx, prix):
+            recus[j].append((float(k), p))
+    return recus
+
+
+@pytest.mark.parametrize('n_ticks', [5, CAPACITE, 3 * CAPACITE + 7])
+def test_last_ticks_survive_wraparound(n_ticks):
+    tampon = TickRing(4, CAPACITE)
+    recus = remplir(tampon, n_ticks, np.random.default_rng(n_ticks))
+    for j, ticks in enumerate(recus):
+        for n in (None, 1, CAPACITE // 2, CAPACITE):
+            attendus = ticks[-(n or CAPACITE):]
+            derniers = tampon.last(j, n)
+            assert derniers['horodatage'].tolist() == [h for h, _ in attendus]
+            assert np.allclose(derniers['prix'], [p for _, p in attendus])
+            assert np.allclose(derniers['volume'], [p * 100 for _, p in attendus])
+
+
+def test_windows_are_read_only_views():
+    tampon = TickRing(2, CAPACITE)
+    remplir(tampon, 2 * CAPACITE + 3, np.random.default_rng(0))
+    derniers = tampon.last(0, CAPACITE)
+    assert np.shares_memory(derniers['prix'], tampon.prix)
+    with pytest.raises(ValueError):
+        derniers['prix'][0] = 0.0
+
+
+def test_memory_does_not_grow_with_ticks():
+    tampon = TickRing(3, CAPACITE)
+    avant = tampon.nbytes
+    remplir(tampon, 10 * CAPACITE, np.random.default_rng(1))
+    assert tampon.nbytes == avant
+
+
+def test_engine_ring_follows_the_book():
+    rng = np.random.default_rng(3)
+    moteur = TickEngine(quote_frame(synthetic_entreprises(20), rng), rng=rng, capacite_ticks=CAPACITE)
+    assert np.array_equal(moteur.intraday.compte, np.ones(len(moteur), dtype=np.int64))
+    for _ in range(5 * CAPACITE):
+        moteur.tick()
+    for j in range(len(moteur)):
+        derniers = moteur.intraday.last(j, 1)
+        assert derniers['prix'][-1] == moteur.prix[j]
+        assert derniers['volume'][-1] == moteur.volume[j]
+    frame = moteur.intraday.frame(0)
+    assert len(frame) == CAPACITE and frame['date'].is_monotonic_increasing
@@ -0,0 +1,222 @@
+# tick_engine.py
+"""Moteur de ticks: carnet de cotations en colonnes NumPy, publié en instantanés copie-sur-écriture"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from bars import BarAggregator
+from scheduler import TICK_INTERVAL
+from ticks import TickRing, read_only
+
+COLONNES_LIVE = ['prix_actuel', 'ouverture', 'plus_haut', 'plus_bas', 'volume',
+                 'variation_pct', 'variation_abs']
+# Attribut du moteur qui porte chaque colonne live
+ATTRIBUTS_LIVE = {'prix_actuel': 'prix', 'ouverture': 'ouverture', 'plus_haut': 'plus_haut', 'plus_bas': 'plus_bas',
+                  'volume': 'volume', 'variation_pct': 'variation_pct', 'variation_abs': 'variation_abs'}
+# Attributs réécrits par un tick (l'ouverture ne change pas en séance)
+ATTRIBUTS_MODIFIES = ('prix', 'plus_haut', 'plus_bas', 'volume', 'variation_pct', 'variation_abs')
+# Ticks simulés d'une séance (jour calendaire) à la cadence par défaut du ticker
+TICKS_PAR_SEANCE = 86400 / TICK_INTERVAL
+
+
+class QuoteSnapshot:
+    """Carnet à une version donnée: vues en lecture seule sur des tableaux que le moteur ne réécrit plus"""
+
+    def __init__(self, version, colonnes, ordre):
+        self.version = version
+        self.colonnes = colonnes
+        self._ordre = ordre
+        self._frame = None
+
+    def __len__(self):
+        return len(self.colonnes[self._ordre[0]])
+
+    def __getitem__(self, colonne):
+        return self.colonnes[colonne]
+
+    @property
+    def frame(self):
+        """DataFrame posé sur les mêmes tableaux (sans copie), construit à la première lecture"""
+        if self._frame is None:
+            self._frame = pd.DataFrame({c: self.colonnes[c] for c in self._ordre}, copy=False)
+        return self._frame
+
+
+class TickEngine:
+    """Carnet de cotations live stocké en tableaux contigus, un tick = quelques opérations vectorielles"""
+
+    def __init__(self, quotes, rng=None, probabilite=0.4, amplitude=0.04, capacite_ticks=None, barres=False,
+                 volume_seance=None, ticks_par_seance=TICKS_PAR_SEANCE):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.probabilite = probabilite
+        self.amplitude = amplitude
+        self.columns = list(quotes.columns)
+        # Colonnes descriptives figées (symbole, nom, secteur, capitalisation...)
+        self.static = quotes[[c for c in self.columns if c not in COLONNES_LIVE]].reset_index(drop=True)
+        self._static_colonnes = {c: read_only(self.static[c].to_numpy()) for c in self.static.columns}
+        self.prix = np.ascontiguousarray(quotes['prix_actuel'], dtype=float).copy()
+        self.ouverture = np.ascontiguousarray(quotes['ouverture'], dtype=float).copy()
+        self.plus_haut = np.ascontiguousarray(quotes['plus_haut'], dtype=float).copy()
+        self.plus_bas = np.ascontiguousarray(quotes['plus_bas'], dtype=float).copy()
+        self.volume = np.ascontiguousarray(quotes['volume'], dtype=float).copy()
+        self.variation_pct = np.ascontiguousarray(quotes['variation_pct'], dtype=float).copy()
+        self.variation_abs = np.ascontiguousarray(quotes['variation_abs'], dtype=float).copy()
+        # Titres échangés par tick simulé: une séance complète cumule volume_seance en moyenne
+        # (par défaut le volume d'ouverture du carnet)
+        volume_seance = self.volume if volume_seance is None else np.asarray(volume_seance, dtype=float)
+        self._volume_tick = volume_seance / (ticks_par_seance * probabilite)
+        self.version = 0
+        # Dernière version ayant modifié chaque symbole: les lecteurs incrémentaux retrouvent les changements
+        self.symbol_version = np.zeros(len(self.prix), dtype=np.int64)
+        # Le carnet peut être partagé entre le ticker et les sessions de lecture
+        self.lock = threading.Lock()
+        # Abonnés nommés appelés sous le verrou avec (positions modifiées, prix) après chaque tick
+        self.listeners = {}
+        # Abonnés nommés appelés hors verrou avec le bilan de la séance à sa clôture
+        self.session_listeners = {}
+        # Dernière erreur d'un abonné de séance: elle ne remonte jamais dans le chemin des ticks
+        self.last_error = None
+        # Dernier instantané publié: tant qu'il porte la version courante, ses tableaux sont partagés
+        self._snapshot = None
+        # Ticks intraday par symbole dans un tampon borné (None: non conservés), amorcé sur le carnet initial
+        self.intraday = None
+        ouverture = time.time()
+        if capacite_ticks:
+            self.intraday = TickRing(len(self.prix), capacite_ticks)
+            self.intraday.record(np.arange(len(self.prix)), ouverture, self.prix, self.volume)
+        # Barres OHLCV de la séance (None: non construites), la première porte le carnet d'ouverture
+        self.bars = None
+        if barres:
+            self.bars = BarAggregator(self.static['symbole'], ouverture)
+            self._record_opening(ouverture)
+
+    def __len__(self):
+        return len(self.prix)
+
+    def tick(self):
+        """Applique un tick à tout le carnet et retourne les positions modifiées"""
+        with self.lock:
+            seance = self._check_session()
+            idx = self._tick()
+        self._notify_session(seance)
+        return idx
+
+    def apply_quotes(self, prix, volume):
+        """Applique des cotations reçues d'une source (NaN: symbole inchangé), retourne les positions modifiées"""
+        prix = np.asarray(prix, dtype=float)
+        volume = np.asarray(volume, dtype=float)
+        with self.lock:
+            seance = self._check_session()
+            # Transaction au même cours: seul le volume cumulé avance, elle compte quand même
+            idx = np.flatnonzero(~np.isnan(prix) & ((prix != self.prix)
+                                                    | (~np.isnan(volume) & (volume != self.volume))))
+            variation = prix[idx] / self.prix[idx] - 1
+            nouveau_volume = np.where(np.isnan(volume[idx]), self.volume[idx], volume[idx])
+            idx = self._apply(idx, prix[idx], variation, nouveau_volume)
+        self._notify_session(seance)
+        return idx
+
+    def _tick(self):
+        # 40% de chance de changement par symbole
+        idx = np.flatnonzero(self.rng.random(len(self.prix)) < self.probabilite)
+        variation = self.rng.uniform(-self.amplitude, self.amplitude, idx.size)
+        nouveau_prix = self.prix[idx] * (1 + variation)
+        # Volume de séance cumulé: chaque tick ajoute les titres échangés
+        nouveau_volume = self.volume[idx] + self._volume_tick[idx] * self.rng.uniform(0, 2, idx.size)
+        return self._apply(idx, nouveau_prix, variation, nouveau_volume)
+
+    def _copy_on_write(self):
+        if self._snapshot is not None and self._snapshot.version == self.version:
+            # Copie sur écriture: l'instantané publié garde les tableaux, le tick écrit dans des copies
+            for attribut in ATTRIBUTS_MODIFIES:
+                setattr(self, attribut, getattr(self, attribut).copy())
+
+    def _apply(self, idx, nouveau_prix, variation, nouveau_volume):
+        if idx.size == 0:
+            # Rien de modifié: pas de nouvelle version, ni copie ni relance des sessions
+            return idx
+        self._copy_on_write()
+        horodatage = time.time()
+        if self.bars is not None:
+            # Titres échangés depuis le tick précédent (un volume cumulé de source ne recule pas)
+            self.bars.record(idx, horodatage, nouveau_prix, np.maximum(nouveau_volume - self.volume[idx], 0))
+        self.prix[idx] = nouveau_prix
+        self.variation_pct[idx] = variation * 100
+        self.variation_abs[idx] = nouveau_prix - self.ouverture[idx]
+
+        # Plus hauts / plus bas glissants
+        self.plus_haut[idx] = np.maximum(self.plus_haut[idx], nouveau_prix)
+        self.plus_bas[idx] = np.minimum(self.plus_bas[idx], nouveau_prix)
+        self.volume[idx] = nouveau_volume
+
+        self.version += 1
+        self.symbol_version[idx] = self.version
+        if self.intraday is not None:
+            self.intraday.record(idx, horodatage, nouveau_prix, nouveau_volume)
+        for ecouteur in self.listeners.values():
+            ecouteur(idx, self.prix)
+        return idx
+
+    def _check_session(self):
+        # Premier tick après minuit: la séance de la veille est close avant d'appliquer le tick
+        if self.bars is not None and time.time() >= self.bars.fin_seance:
+            return self._close_session()
+        return None
+
+    def close_session(self):
+        """Clôt la séance (bilan quotidien transmis aux abonnés) et ouvre la suivante au dernier prix"""
+        with self.lock:
+            seance = self._close_session()
+        self._notify_session(seance)
+        return seance
+
+    def _notify_session(self, seance):
+        # Appelé après libération du verrou: une persistance lente ne bloque pas les lecteurs du carnet
+        if seance is None:
+            return
+        for ecouteur in list(self.session_listeners.values()):
+            try:
+                ecouteur(seance)
+            except Exception as erreur:
+                self.last_error = erreur
+
+    def _close_session(self):
+        # Bilan quotidien: les extrêmes et le volume du carnet sont ceux de l'ensemble des barres de la séance
+        seance = {'date': self.bars.date, 'ouverture': self.ouverture.copy(), 'plus_haut': self.plus_haut.copy(),
+                  'plus_bas': self.plus_bas.copy(), 'cloture': self.prix.copy(), 'volume': self.volume.copy()}
+        self._copy_on_write()
+        # Nouveaux tableaux: les instantanés publiés gardent la séance close
+        self.ouverture = self.prix.copy()
+        self.plus_haut = self.prix.copy()
+        self.plus_bas = self.prix.copy()
+        self.volume = np.zeros(len(self.prix))
+        self.variation_pct = np.zeros(len(self.prix))
+        self.variation_abs = np.zeros(len(self.prix))
+        # Séance suivante ouverte au jour qui suit la séance close, même si la clôture est anticipée
+        ouverture = max(time.time(), self.bars.fin_seance)
+        self.bars.start_session(ouverture)
+        self._record_opening(ouverture)
+        self.version += 1
+        self.symbol_version[:] = self.version
+        return seance
+
+    def _record_opening(self, horodatage):
+        # Première barre de la séance: le carnet d'ouverture (prix et volume du fixing)
+        self.bars.record(np.arange(len(self.prix)), horodatage, self.prix, self.volume)
+
+    def snapshot(self):
+        """Instantané de la version courante, partagé par tous les lecteurs (aucune copie à la lecture)"""
+        with self.lock:
+            if self._snapshot is None or self._snapshot.version != self.version:
+                colonnes = dict(self._static_colonnes)
+                for colonne, attribut in ATTRIBUTS_LIVE.items():
+                    colonnes[colonne] = read_only(getattr(self, attribut))
+                self._snapshot = QuoteSnapshot(self.version, colonnes, self.columns)
+            return self._snapshot
+
+    def frame(self):
+        """Vue DataFrame en lecture seule de l'instantané courant"""
+        return self.snapshot().frame
+
@@ -0,0 +1,71 @@
+# ticks.py
+"""Historique intraday des ticks: tampons circulaires préalloués par symbole (horodatage, prix, volume)"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Ticks conservés par symbole: la mémoire est fixée à la création, les plus anciens sont écrasés
+CAPACITE_TICKS = 1024
+CHAMPS_TICKS = ('horodatage', 'prix', 'volume')
+
+
+class TickRing:
+    """Tampon circulaire (symboles × capacité) écrit en double: les N derniers ticks sont toujours contigus"""
+
+    def __init__(self, n, capacite=CAPACITE_TICKS):
+        self.capacite = capacite
+        # Chaque tick est écrit en colonne p et p + capacité: une fenêtre glissante n'est jamais coupée en deux
+        self.horodatage = np.zeros((n, 2 * capacite))
+        self.prix = np.zeros((n, 2 * capacite))
+        self.volume = np.zeros((n, 2 * capacite))
+        # Ticks reçus depuis la création, par symbole (la position d'écriture s'en déduit)
+        self.compte = np.zeros(n, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.compte)
+
+    @property
+    def nbytes(self):
+        """Mémoire occupée, indépendante du nombre de ticks reçus"""
+        return sum(getattr(self, champ).nbytes for champ in CHAMPS_TICKS) + self.compte.nbytes
+
+    def record(self, idx, horodatage, prix, volume):
+        """Enregistre un tick pour les positions idx, écrit en place dans les tableaux préalloués"""
+        # Positions à plat dans les tableaux (symbole × 2 capacité): une écriture indexée par copie
+        plat = idx * (2 * self.capacite) + self.compte[idx] % self.capacite
+        for champ, valeurs in (('horodatage', horodatage), ('prix', prix), ('volume', volume)):
+            tableau = getattr(self, champ).reshape(-1)
+            tableau[plat] = valeurs
+            tableau[plat + self.capacite] = valeurs
+        self.compte[idx] += 1
+
+    def last(self, position, n=None):
+        """N derniers ticks d'un symbole, du plus ancien au plus récent, en vues sur le tampon (sans copie)
+
+        Une vue reste valable jusqu'à ce que capacité - n nouveaux ticks du symbole l'écrasent.
+        """
+        disponibles = int(min(self.compte[position], self.capacite))
+        n = disponibles if n is None else min(n, disponibles)
+        fin = (int(self.compte[position]) - 1) % self.capacite + self.capacite + 1
+        return {champ: read_only(getattr(self, champ)[position, fin - n:fin]) for champ in CHAMPS_TICKS}
+
+    def frame(self, position, n=None):
+        """N derniers ticks d'un symbole en DataFrame horodaté (copie, pour les graphiques)"""
+        ticks = self.last(position, n)
+        horodatage = ticks['horodatage']
+        decalage = local_offset(horodatage[-1]) if len(horodatage) else 0
+        return pd.DataFrame({'date': pd.to_datetime(horodatage + decalage, unit='s'),
+                             'prix': ticks['prix'], 'volume': ticks['volume']})
+
+
+def local_offset(horodatage):
+    """Décalage (s) de l'heure locale sur UTC à cet instant: les dates affichées suivent l'horloge murale"""
+    return datetime.fromtimestamp(horodatage).astimezone().utcoffset().total_seconds()
+
+
+def read_only(valeurs):
+    """Vue en lecture seule sur un tableau (sans copie): le propriétaire peut encore l'écrire"""
+    vue = valeurs.view()
+    vue.setflags(write=False)
+    return vue